@@ -1,6 +1,7 @@
 # agents/address_purpose.py
 import asyncio
 import json
+import logging
 import aiohttp
 import ssl
 import certifi
@@ -13,6 +14,8 @@ load_dotenv()
 # Import the order placement function
 from services.order_placement import place_order_request
 
+logger = logging.getLogger(__name__)
+
 # Initialize Async client for OpenRouter
 client = AsyncOpenAI(
     api_key=os.getenv("OPENROUTER_API_KEY"),
@@ -97,9 +100,8 @@ async def handle_address_purpose(user_input: str, session_data: dict):
         return ai_response["response"], session_data
         
     except Exception as e:
-        print(f"❌ Error in handle_address_purpose: {e}")
-        import traceback
-        print(f"🔍 Full traceback: {traceback.format_exc()}")
+        # Through the logging queue: the stream write happens on the listener thread, not the event loop
+        logger.exception("❌ Error in handle_address_purpose: %s", e)
         error_msg = "I apologize, but I'm having trouble processing your address information. Please try again."
         session_data.setdefault("history", []).append({
             "user": user_input,
@@ -0,0 +1,12 @@
+# agents/fields.py
+# Required product_details fields per request type. Shared by agent 2 (agents/request_details.py)
+# and the session manager (services/agent_manager.py) so both always agree on what a request needs.
+
+FULL_REQUEST_FIELDS = ("unit", "quantity", "price_per_unit", "expected_price", "phone", "incoterm", "mode_of_payment", "packaging_pref", "delivery_date")
+REQUIRED_FIELDS = {
+    "order":  FULL_REQUEST_FIELDS,
+    "sample": FULL_REQUEST_FIELDS,
+    "quote":  FULL_REQUEST_FIELDS,
+    "ppr":    ("unit", "quantity", "price_per_unit", "expected_price", "delivery_date")  # PPR has different requirements
+}
+DEFAULT_REQUIRED_FIELDS = ("unit", "quantity", "price_per_unit", "expected_price")
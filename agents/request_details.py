@@ -1,33 +1,197 @@
 # agents/request_details.py
 import asyncio
-import json
+import hashlib
+import importlib.util
+import logging
+import random
 import re
-from datetime import datetime, timedelta
-from openai import AsyncOpenAI
+import time
+from collections import OrderedDict
+from string import Template
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+import httpx
+import orjson
 import os
-import phonenumbers
 from dotenv import load_dotenv
+from agents.fields import REQUIRED_FIELDS, DEFAULT_REQUIRED_FIELDS
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize Async client for OpenRouter
-client = AsyncOpenAI(
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-    base_url="https://openrouter.ai/api/v1"
-)
+logger = logging.getLogger(__name__)
+
+# Async client for OpenRouter - built on first use, not at import time, and shared by every
+# session. We own its httpx pool so concurrent turns reuse warm keep-alive connections
+# instead of re-handshaking TLS on every burst (HTTP/2 when the h2 extra is installed).
+@lru_cache(maxsize=1)
+def get_client() -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key=os.getenv("OPENROUTER_API_KEY"),
+        base_url="https://openrouter.ai/api/v1",
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=30.0),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            http2=importlib.util.find_spec("h2") is not None
+        ),
+        max_retries=0  # retries are done by with_retry() so they don't stack with the SDK's own
+    )
+
+# Transient OpenRouter failures worth another attempt; anything else (bad request, auth) fails fast
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+# Caps in-flight completions across all sessions to stay under the key's rate limit
+_completion_semaphore = asyncio.Semaphore(int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "20")))
+
+async def with_retry(coro_factory, attempts: int = 4):
+    """Await coro_factory() with bounded, jittered exponential backoff on transient errors"""
+    for attempt in range(attempts):
+        try:
+            async with _completion_semaphore:
+                return await coro_factory()
+        except RETRYABLE_ERRORS as e:
+            if attempt == attempts - 1:
+                raise
+            delay = (2 ** attempt) * 0.5 + random.random() * 0.25
+            logger.warning("⚠️ Completion failed (%s), retrying in %.2fs (%d/%d)",
+                           type(e).__name__, delay, attempt + 1, attempts - 1)
+            await asyncio.sleep(delay)
+
+# Exact-match cache for both completions of a turn. Keyed on the full prompt, history and
+# normalized user message, so a hit is the same question in the same state (e.g. the opening
+# "I want to order" for the same product). Tool calls in a cached response are replayed
+# through the local validators, so session updates still happen - and since those results
+# are deterministic, the follow-up completion then hits the cache too.
+# The cache is process-wide, NOT per session: a hit replays another user's sampled reply,
+# tool_call ids included, whenever their prompt, history and message were identical.
+# Don't put anything in the messages that must not be shared between users.
+COMPLETION_CACHE_SIZE = 1000
+_completion_cache: "OrderedDict[str, object]" = OrderedDict()
+
+def _completion_cache_key(model: str, messages: list, request_options: dict) -> str:
+    *context, last = messages
+    if last.get("role") == "user":
+        last = " ".join(last["content"].lower().split())
+    payload = orjson.dumps(
+        [model, context, last, request_options],  # tools / tool_choice / max_tokens change the reply too
+        default=lambda obj: obj.model_dump(),  # SDK tool_call objects in follow-up messages
+        option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+async def create_completion_cached(model: str, messages: list, **kwargs):
+    """chat.completions.create with an in-process LRU in front of it"""
+    key = _completion_cache_key(model, messages, kwargs)
+    cached = _completion_cache.get(key)
+    if cached is not None:
+        _completion_cache.move_to_end(key)
+        logger.debug("⚡ Completion cache hit: %s", key)
+        return cached
+    
+    response = await with_retry(
+        lambda: get_client().chat.completions.create(model=model, messages=messages, **kwargs)
+    )
+    _completion_cache[key] = response
+    if len(_completion_cache) > COMPLETION_CACHE_SIZE:
+        _completion_cache.popitem(last=False)
+    return response
+
+def _dumps(obj) -> str:
+    """orjson-encode a tool result; the SDK wants str message content"""
+    return orjson.dumps(obj).decode()
+
+# Opt-in: race a tool-free reply against the tool-calling request (costs an extra completion per turn)
+SPECULATIVE_REPLY = os.getenv("REQUEST_DETAILS_SPECULATIVE_REPLY", "false").lower() == "true"
+
+# Past user/agent exchanges replayed to the model each turn - the system prompt already
+# carries every collected field, so older turns only add input tokens
+HISTORY_EXCHANGES = 3
 
 # Allowed units for user selection
-ALLOWED_UNITS = ["KG", "GAL", "LB", "L"]
+ALLOWED_UNITS = ("KG", "GAL", "LB", "L")
+
+# Tool schema for agent 2 - built once at import (tuple so nothing can mutate it per turn),
+# shared by the live chat path and the offline batch path
+TOOLS = (
+    {
+        "type": "function",
+        "function": {
+            "name": "extract_and_validate_all_fields",
+            "description": "Extract ALL field values from user message and validate them in bulk. Also used to store corrections (send only the changed fields). expected_price is calculated automatically",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "extracted_fields": {
+                        "type": "object",
+                        "description": "All field values extracted from user message",
+                        "properties": {
+                            "unit": {
+                                "type": "string",
+                                "description": "Extracted unit value (KG, GAL, LB, L), must ask from User"
+                            },
+                            "quantity": {
+                                "type": "number",
+                                "description": "Extracted quantity value"
+                            },
+                            "price_per_unit": {
+                                "type": "number", 
+                                "description": "Extracted price per unit value"
+                            },
+                            "phone": {
+                                "type": "string",
+                                "description": "Extracted phone number"
+                            },
+                            "incoterm": {
+                                "type": "string",
+                                "description": "Extracted incoterm value"
+                            },
+                            "mode_of_payment": {
+                                "type": "string",
+                                "description": "Extracted payment method"
+                            },
+                            "packaging_pref": {
+                                "type": "string",
+                                "description": "Extracted packaging preference"
+                            },
+                            "delivery_date": {
+                                "type": "string",
+                                "description": "Extracted delivery date"
+                            }
+                        }
+                    },
+                    "request_type": {  # ADD THIS
+                        "type": "string",
+                        "description": "Type of request for validation rules"
+                    }
+                },
+                "required": ["extracted_fields"]  # request_type is optional
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "check_completion_status",
+            "description": "Call after the user's final confirmation - checks that all required fields are completed and hands over",
+            "parameters": {
+                "type": "object",
+                "properties": {}
+            }
+        }
+    }
+)
 
 async def handle_request_details(user_input: str, session_data: dict):
     """
     Agent 2: Request Details Handler - Collects and validates all request details
+    Only called by the agent manager when session's agent is "request_details"
     """
     try:
-        # Check if we should hand over
-        if session_data.get("agent") != "request_details":
-            return "I'll hand you over to the next specialist.", session_data
-        
         # Process with AI using validation tools
         ai_response = await process_request_details(user_input, session_data)
         
@@ -39,12 +203,12 @@ async def handle_request_details(user_input: str, session_data: dict):
                     if "product_details" not in session_data:
                         session_data["product_details"] = {}
                     session_data["product_details"][key] = value
-                    print(f"💾 Updated field: {key} = {value}")
+                    logger.debug("💾 Updated field: %s = %s", key, value)
             
             # Check if all fields are completed and hand over
             if ai_response.get("handover_ready", False):
                 session_data["agent"] = "address_purpose"
-                print("🚀 All fields completed - handing over to agent 3")
+                logger.debug("🚀 All fields completed - handing over to agent 3")
         
         # Add to history
         session_data.setdefault("history", []).append({
@@ -55,7 +219,7 @@ async def handle_request_details(user_input: str, session_data: dict):
         return ai_response["response"], session_data
         
     except Exception as e:
-        print(f"❌ Error in handle_request_details: {e}")
+        logger.error("❌ Error in handle_request_details: %s", e)
         error_msg = "I apologize, but I'm having trouble processing your request. Please try again."
         session_data.setdefault("history", []).append({
             "user": user_input,
@@ -72,8 +236,7 @@ async def process_request_details(user_input: str, session_data: dict):
     
     # Get required fields for this request type
     required_fields = get_required_fields(request_type)
-    completed_fields = get_completed_fields(product_details, required_fields)
-    pending_fields = [f for f in required_fields if f not in completed_fields]
+    completed_fields, pending_fields = split_fields_by_completion(product_details, required_fields)
     
     # Build system prompt
     system_prompt = build_system_prompt(session_data, required_fields, completed_fields, pending_fields)
@@ -84,161 +247,35 @@ async def process_request_details(user_input: str, session_data: dict):
     
     # Add conversation history
     history = session_data.get("history", [])
-    for entry in history[-20:]:  # Last 3 exchanges
+    for entry in history[-HISTORY_EXCHANGES:]:  # Last 3 exchanges
         messages.append({"role": "user", "content": entry["user"]})
         messages.append({"role": "assistant", "content": entry["agent"]})
     
     messages.append({"role": "user", "content": user_input})
     
+    # Speculative reply: generated in parallel with the tool-calling request so that a turn
+    # whose tool calls are all clean extractions needs one round-trip instead of two
+    speculative_task = None
+    if SPECULATIVE_REPLY:
+        speculative_messages = list(messages)
+        # Single attempt: on failure the turn just falls back to the follow-up call
+        speculative_task = asyncio.create_task(with_retry(lambda: get_client().chat.completions.create(
+            model="openai/gpt-4o",
+            messages=speculative_messages,
+            max_tokens=800,
+            tools=TOOLS,
+            tool_choice="none"
+        ), attempts=1))
+        # Retrieve any exception so a discarded speculation doesn't log "never retrieved"
+        speculative_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    
     # Get AI response with tool calling
     try:
-        response = await client.chat.completions.create(
+        response = await create_completion_cached(
             model="openai/gpt-4o",  # CHANGED: Using GPT-4o instead of Claude
             messages=messages,
             max_tokens=1000,
-            tools=[
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "extract_and_validate_all_fields",
-                        "description": "Extract ALL field values from user message and validate them in bulk",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "extracted_fields": {
-                                    "type": "object",
-                                    "description": "All field values extracted from user message",
-                                    "properties": {
-                                        "unit": {
-                                            "type": "string",
-                                            "description": "Extracted unit value (KG, GAL, LB, L), must ask from User"
-                                        },
-                                        "quantity": {
-                                            "type": "number",
-                                            "description": "Extracted quantity value"
-                                        },
-                                        "price_per_unit": {
-                                            "type": "number", 
-                                            "description": "Extracted price per unit value"
-                                        },
-                                        "phone": {
-                                            "type": "string",
-                                            "description": "Extracted phone number"
-                                        },
-                                        "incoterm": {
-                                            "type": "string",
-                                            "description": "Extracted incoterm value"
-                                        },
-                                        "mode_of_payment": {
-                                            "type": "string",
-                                            "description": "Extracted payment method"
-                                        },
-                                        "packaging_pref": {
-                                            "type": "string",
-                                            "description": "Extracted packaging preference"
-                                        },
-                                        "delivery_date": {
-                                            "type": "string",
-                                            "description": "Extracted delivery date"
-                                        }
-                                    }
-                                },
-                                "request_type": {  # ADD THIS
-                                    "type": "string",
-                                    "description": "Type of request for validation rules"
-                                }
-                            },
-                            "required": ["extracted_fields"]  # request_type is optional
-                        }
-                    }
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "validate_individual_field",
-                        "description": "Validate a single field value",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "field_name": {
-                                    "type": "string",
-                                    "description": "Name of the field to validate",
-                                    "enum": ["unit", "quantity", "phone", "delivery_date", "incoterm", "mode_of_payment", "packaging_pref"]
-                                },
-                                "field_value": {
-                                    "type": "string",
-                                    "description": "Value to validate"
-                                },
-                                "request_type": {  
-                                    "type": "string", 
-                                    "description": "Type of request (sample, order (order of purchase), quote (quotation or offer price), ppr (purchase price request)) for validation rules"
-                                }
-                            },
-                            "required": ["field_name", "field_value"]  # request_type is optional
-                        }
-                    }
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "calculate_expected_price",
-                        "description": "Calculate expected price from quantity and price per unit",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "quantity": {
-                                    "type": "number",
-                                    "description": "Quantity value"
-                                },
-                                "price_per_unit": {
-                                    "type": "number",
-                                    "description": "Price per unit in Bangladesh Taka"
-                                }
-                            },
-                            "required": ["quantity", "price_per_unit"]
-                        }
-                    }
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "update_validated_field",
-                        "description": "Update a field value after successful validation",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "field_name": {
-                                    "type": "string",
-                                    "description": "Name of the field to update"
-                                },
-                                "field_value": {
-                                    "type": "string",
-                                    "description": "Validated value to store"
-                                }
-                            },
-                            "required": ["field_name", "field_value"]
-                        }
-                    }
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "check_completion_status",
-                        "description": "Check if all required fields are completed",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "completed_fields": {
-                                    "type": "array",
-                                    "description": "List of completed field names",
-                                    "items": {"type": "string"}
-                                }
-                            },
-                            "required": ["completed_fields"]
-                        }
-                    }
-                }
-            ],
+            tools=TOOLS,
             tool_choice="auto"
         )
         
@@ -246,15 +283,20 @@ async def process_request_details(user_input: str, session_data: dict):
         response_content = message.content or ""
         tool_calls = message.tool_calls or []
         
-        print(f"🧠 AI response: {response_content}")
-        print(f"🔧 Tool calls: {len(tool_calls)}")
+        logger.debug("🧠 AI response: %s", response_content)
+        logger.debug("🔧 Tool calls: %d", len(tool_calls))
         
         # Process tool calls
         session_updates = {}
         handover_ready = False
+        # The speculative reply is only usable when every tool call was an extraction whose
+        # fields all validated - anything else (errors, prices to show, handover) needs the tool results
+        speculation_ok = speculative_task is not None
         
         if tool_calls:
-            follow_up_messages = messages.copy()
+            # Extend the same list in place - the first request has already been sent and nothing
+            # else reads it (the speculative reply got its own copy)
+            follow_up_messages = messages
             follow_up_messages.append({
                 "role": "assistant",
                 "content": response_content,
@@ -263,144 +305,77 @@ async def process_request_details(user_input: str, session_data: dict):
             
             for tool_call in tool_calls:
                 function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
+                function_args = orjson.loads(tool_call.function.arguments)
                 
-                print(f"🛠️ Processing tool call: {function_name} with args: {function_args}")
+                logger.debug("🛠️ Processing tool call: %s with args: %s", function_name, function_args)
                 
                 if function_name == "extract_and_validate_all_fields":
                     # Process all extracted fields in bulk
                     extracted_fields = function_args.get("extracted_fields", {})
                     # GET REQUEST TYPE FROM ARGS OR SESSION
                     req_type = function_args.get("request_type", request_type)
-                    validation_results = {}
-                    
-                    for field_name, field_value in extracted_fields.items():
-                        if field_value is not None:
-                            # Validate each field
-                            if field_name == "unit":
-                                result = validate_unit({"unit": field_value})
-                            elif field_name == "quantity":
-                                # PASS THE REQUEST TYPE HERE
-                                result = validate_quantity({"quantity": field_value}, product_details, req_type)
-                            elif field_name == "delivery_date":
-                                result = validate_date({"delivery_date": field_value})
-                            elif field_name in ["incoterm", "mode_of_payment", "packaging_pref"]:
-                                result = validate_selection({"field_name": field_name, "selected_value": field_value})
-                            elif field_name == "phone":
-                                result = validate_phone({"phone": field_value})
-                            else:
-                                result = {"is_valid": True, "message": f"{field_name} value accepted"}
-                            
-                            validation_results[field_name] = result
-                            
-                            # If valid, update session
-                            if result.get("is_valid", False):
-                                # For unit field, use the normalized value
-                                if field_name == "unit":
-                                    session_updates[field_name] = result.get("normalized_value", field_value)
-                                else:
-                                    session_updates[field_name] = field_value
-                                print(f"✅ Validated and will update {field_name}: {field_value}")              
-                    # Calculate expected price if both quantity and price_per_unit are provided
-                    if (extracted_fields.get("quantity") and extracted_fields.get("price_per_unit") and
-                        validation_results.get("quantity", {}).get("is_valid") and
-                        extracted_fields.get("price_per_unit") > 0):
-                        
-                        price_result = calculate_expected_price({
-                            "quantity": extracted_fields["quantity"],
-                            "price_per_unit": extracted_fields["price_per_unit"]
-                        })
-                        if price_result.get("status") == "success":
-                            session_updates["expected_price"] = price_result["calculated_value"]
-                            print(f"💰 Calculated expected price: {price_result['calculated_value']}")
-                    
-                    follow_up_messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": json.dumps({
-                            "validation_results": validation_results,
-                            "fields_updated": list(session_updates.keys())
-                        })
-                    })
-                    
-                elif function_name == "validate_individual_field":
-                    field_name = function_args["field_name"]
-                    field_value = function_args["field_value"]
-                    # GET THE REQUEST TYPE FROM ARGS OR USE THE ONE FROM SESSION
-                    req_type = function_args.get("request_type", request_type)
-                    
-                    if field_name == "unit":
-                        result = validate_unit({"unit": field_value})
-                    elif field_name == "quantity":
-                        # PASS THE REQUEST TYPE HERE
-                        result = validate_quantity({"quantity": field_value}, product_details, req_type)
-                    elif field_name == "delivery_date":
-                        result = validate_date({"delivery_date": field_value})
-                    elif field_name in ["incoterm", "mode_of_payment", "packaging_pref"]:
-                        result = validate_selection({"field_name": field_name, "selected_value": field_value})
-                    elif field_name == "phone":
-                        result = validate_phone({"phone": field_value})
-                    else:
-                        result = {"is_valid": True, "message": f"{field_name} value accepted"}
+                    validation_results, field_updates = validate_extracted_fields(extracted_fields, product_details, req_type)
+                    session_updates.update(field_updates)
+                    if "expected_price" in field_updates:
+                        speculation_ok = False  # the reply must show the tool-calculated price
+                    if not all(result.get("is_valid", False) for result in validation_results.values()):
+                        speculation_ok = False
                     
+                    tool_result = {
+                        "validation_results": validation_results,
+                        "fields_updated": list(session_updates.keys())
+                    }
+                    if "expected_price" in field_updates:
+                        tool_result["expected_price"] = field_updates["expected_price"]
                     follow_up_messages.append({
                         "role": "tool",
                         "tool_call_id": tool_call.id,
-                        "content": json.dumps(result)
+                        "content": _dumps(tool_result)
                     })
                     
-                elif function_name == "calculate_expected_price":
-                    result = calculate_expected_price(function_args)
-                    if result.get("status") == "success":
-                        session_updates["expected_price"] = result["calculated_value"]
+                elif function_name == "check_completion_status":
+                    speculation_ok = False
+                    # Computed from the stored values plus this turn's updates, not from what the model claims
+                    result = check_completion_status({**product_details, **session_updates}, required_fields)
+                    handover_ready = result.get("all_completed", False)
                     follow_up_messages.append({
                         "role": "tool",
                         "tool_call_id": tool_call.id,
-                        "content": json.dumps(result)
+                        "content": _dumps(result)
                     })
                     
-                elif function_name == "update_validated_field":
-                    # For unit field, ensure we're storing the normalized value
-                    if function_args["field_name"] == "unit":
-                        unit_result = validate_unit({"unit": function_args["field_value"]})
-                        if unit_result.get("is_valid", False):
-                            session_updates[function_args["field_name"]] = unit_result.get("normalized_value", function_args["field_value"])
-                        else:
-                            # If invalid, don't update and return error
-                            follow_up_messages.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call.id,
-                                "content": json.dumps({"status": "error", "message": f"Invalid unit: {function_args['field_value']}"})
-                            })
-                            continue
-                    else:
-                        session_updates[function_args["field_name"]] = function_args["field_value"]
-                    
+                else:
+                    # Every tool call needs a tool message or the follow-up request is rejected
+                    speculation_ok = False
                     follow_up_messages.append({
                         "role": "tool",
                         "tool_call_id": tool_call.id,
-                        "content": json.dumps({"status": "success", "field_updated": function_args["field_name"]})
-                    })
-                    
-                elif function_name == "check_completion_status":
-                    result = check_completion_status(function_args, required_fields)
-                    handover_ready = result.get("all_completed", False)
-                    follow_up_messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": json.dumps(result)
+                        "content": _dumps({"status": "error", "message": f"Unknown tool: {function_name}"})
                     })
             
-            # Get final response after tool processing
-            final_response_obj = await client.chat.completions.create(
-                model="openai/gpt-4o",  # CHANGED: Using GPT-4o instead of Claude
-                messages=follow_up_messages,
-                max_tokens=800
-            )
-            final_response = final_response_obj.choices[0].message.content or ""
+            final_response = ""
+            if speculation_ok:
+                try:
+                    final_response = (await speculative_task).choices[0].message.content or ""
+                    speculative_task = None
+                    logger.debug("⚡ Using speculative reply - all extracted fields valid")
+                except Exception as e:
+                    logger.warning("⚠️ Speculative reply failed, falling back to follow-up call: %s", e)
+            
+            if not final_response:
+                # Get final response after tool processing
+                final_response_obj = await create_completion_cached(
+                    model="openai/gpt-4o",  # CHANGED: Using GPT-4o instead of Claude
+                    messages=follow_up_messages,
+                    max_tokens=800
+                )
+                final_response = final_response_obj.choices[0].message.content or ""
         else:
             final_response = response_content
         
+        if speculative_task is not None:
+            speculative_task.cancel()
+        
         return {
             "response": final_response,
             "session_updates": session_updates,
@@ -408,7 +383,9 @@ async def process_request_details(user_input: str, session_data: dict):
         }
         
     except Exception as e:
-        print(f"❌ Error in process_request_details: {e}")
+        if speculative_task is not None:
+            speculative_task.cancel()
+        logger.error("❌ Error in process_request_details: %s", e)
         # Return a helpful response even when AI processing fails
         pending_fields = [f for f in get_required_fields(session_data.get("request", "").lower()) 
                          if session_data.get("product_details", {}).get(f) in [None, ""]]
@@ -424,12 +401,80 @@ async def process_request_details(user_input: str, session_data: dict):
             "handover_ready": len(pending_fields) == 0
         }
 
+def validate_extracted_fields(extracted_fields: dict, product_details: dict, request_type: str) -> tuple:
+    """
+    Validate a bulk extraction (extract_and_validate_all_fields args).
+    Returns (validation_results, updates) - updates holds the valid fields plus expected_price when computable.
+    Shared by the live chat turn and offline batch results.
+    """
+    validation_results = {}
+    updates = {}
+    
+    for field_name, field_value in extracted_fields.items():
+        if field_value is not None:
+            # Validate each field
+            result = validate_field(field_name, field_value, product_details, request_type)
+            validation_results[field_name] = result
+            
+            # If valid, update session
+            if result.get("is_valid", False):
+                # Store the canonical spelling for unit/selection fields (aliases are accepted)
+                updates[field_name] = result.get("normalized_value", field_value)
+                logger.debug("✅ Validated and will update %s: %s", field_name, field_value)
+    
+    # Recalculate expected price whenever quantity or price_per_unit changed - the other
+    # value may have been stored in an earlier turn
+    quantity = updates.get("quantity", product_details.get("quantity"))
+    price_per_unit = updates.get("price_per_unit", product_details.get("price_per_unit"))
+    if ("quantity" in updates or "price_per_unit" in updates) and quantity and price_per_unit:
+        price_result = calculate_expected_price({
+            "quantity": quantity,
+            "price_per_unit": price_per_unit
+        })
+        if price_result.get("status") == "success" and price_result["calculated_value"] > 0:
+            updates["expected_price"] = price_result["calculated_value"]
+            logger.debug("💰 Calculated expected price: %s", price_result["calculated_value"])
+    
+    return validation_results, updates
+
 # Validation Functions - ADD UNIT VALIDATION
+# Enum options and the spellings users/LLM commonly use for them, lowercased -> canonical.
+# Built once at import so validation is a single dict lookup per value.
+SELECTION_OPTIONS = {
+    "unit": ALLOWED_UNITS,
+    "incoterm": ("Ex Factory", "Deliver to Buyer Factory"),
+    "mode_of_payment": ("LC", "TT", "Cash"),
+    "packaging_pref": ("Bulk Tanker", "PP Bag", "Jerry Can", "Drum")
+}
+_SELECTION_ALIASES = {
+    "unit": {
+        "kgs": "KG", "kilo": "KG", "kilos": "KG", "kilogram": "KG", "kilograms": "KG",
+        "gallon": "GAL", "gallons": "GAL",
+        "lbs": "LB", "pound": "LB", "pounds": "LB",
+        "liter": "L", "liters": "L", "litre": "L", "litres": "L"
+    },
+    "incoterm": {
+        "ex-factory": "Ex Factory", "ex works": "Ex Factory", "ex-works": "Ex Factory",
+        "delivery from factory": "Ex Factory"
+    },
+    "mode_of_payment": {
+        "letter of credit": "LC", "t.t": "TT", "telegraphic transfer": "TT", "bank transfer": "TT"
+    },
+    "packaging_pref": {
+        "bulk tanker (in truck)": "Bulk Tanker", "bulk-tanker": "Bulk Tanker",
+        "pp bags": "PP Bag", "jerry cans": "Jerry Can", "drums": "Drum"
+    }
+}
+_SELECTION_LOOKUP = {
+    field_name: {**{opt.lower(): opt for opt in options}, **_SELECTION_ALIASES.get(field_name, {})}
+    for field_name, options in SELECTION_OPTIONS.items()
+}
+
 def validate_unit(args: dict) -> dict:
     """Validate unit is one of the allowed values"""
-    unit_value = args["unit"].strip().upper()
+    unit_value = _SELECTION_LOOKUP["unit"].get(args["unit"].strip().lower())
     
-    if unit_value in ALLOWED_UNITS:
+    if unit_value:
         return {
             "is_valid": True,
             "message": f"Unit {unit_value} is valid",
@@ -489,18 +534,32 @@ def validate_quantity(args: dict, product_details: dict, request_type: str = "")
             "message": "Invalid quantity format. Please enter a valid number."
         }
 
+_DATE_SHAPE_RE = re.compile(r"\d{4}-\d{1,2}-\d{1,2}")
+
 def validate_date(args: dict) -> dict:
     """Validate delivery date is in the future"""
     delivery_date_str = args["delivery_date"]
-    today = datetime.now().date()
+    today = _today()
+    
+    # Same shapes strptime("%Y-%m-%d") accepted - on 3.11+ fromisoformat alone would also
+    # take "20301231" or "2030-W01-1", which then reach the order API unchanged
+    if not _DATE_SHAPE_RE.fullmatch(delivery_date_str):
+        return {
+            "is_valid": False,
+            "message": "Invalid date format. Please use YYYY-MM-DD format (e.g., 2024-12-31)"
+        }
     
     try:
-        delivery_date = datetime.strptime(delivery_date_str, "%Y-%m-%d").date()
+        try:
+            delivery_date = date.fromisoformat(delivery_date_str)  # C fast path for YYYY-MM-DD
+        except ValueError:
+            # Non-padded dates like 2024-1-5 were always accepted - keep them working
+            delivery_date = datetime.strptime(delivery_date_str, "%Y-%m-%d").date()
         if delivery_date <= today:
             return {
                 "is_valid": False,
-                "message": f"Delivery date must be after today ({today.strftime('%Y-%m-%d')})",
-                "today": today.strftime("%Y-%m-%d")
+                "message": f"Delivery date must be after today ({_today_str()})",
+                "today": _today_str()
             }
         else:
             return {
@@ -518,21 +577,12 @@ def validate_selection(args: dict) -> dict:
     field_name = args["field_name"]
     selected_value = args["selected_value"].strip()
     
-    options_map = {
-        "unit": ["KG", "GAL", "LB", "L"],
-        "incoterm": ["Ex Factory", "Deliver to Buyer Factory"],
-        "mode_of_payment": ["LC", "TT", "Cash"],
-        "packaging_pref": ["Bulk Tanker", "PP Bag", "Jerry Can", "Drum"]
-    }
-    
-    allowed_options = options_map.get(field_name, [])
+    allowed_options = SELECTION_OPTIONS.get(field_name, ())
     
-    # Case-insensitive matching
-    normalized_selected = selected_value.lower()
-    normalized_options = [opt.lower() for opt in allowed_options]
+    # Case-insensitive matching (plus common aliases)
+    actual_value = _SELECTION_LOOKUP.get(field_name, {}).get(selected_value.lower())
     
-    if normalized_selected in normalized_options:
-        actual_value = allowed_options[normalized_options.index(normalized_selected)]
+    if actual_value:
         return {
             "is_valid": True,
             "message": f"Selected {actual_value} is valid for {field_name}",
@@ -546,25 +596,54 @@ def validate_selection(args: dict) -> dict:
             "allowed_options": allowed_options
         }
 
+# Single compiled pre-check for every accepted phone shape: phonenumbers.parse(phone, None)
+# only succeeds when a '+' (ASCII or full-width) leads into the digits, e.g. "+880...", "(+880) ...",
+# and no country code + national number in its metadata is shorter than 6 digits.
+# Letters count towards the length because phonenumbers maps vanity numbers ("+1 800 FLOWERS") to digits
+# Anything may sit between the '+' and the country code ("+[880] ...", "+~880 ...", "+x44 ...") -
+# phonenumbers strips its whole punctuation set there, so the pre-check must not be stricter
+_PHONE_RE = re.compile(r"[+\uFF0B]\D*\d(?:[^\dA-Za-z]*[\dA-Za-z]){5}")
 
 def validate_phone(args: dict) -> dict:
     """Validate international phone numbers - minimal version"""
-    phone = args["phone"].strip()
+    is_valid, message = _check_phone(args["phone"].strip())
+    return {
+        "is_valid": is_valid,
+        "message": message
+    }
+
+@lru_cache(maxsize=1024)
+def _check_phone(phone: str) -> tuple:
+    """Cached (is_valid, message) for a stripped phone string - users re-send the same number across turns"""
+    if not _PHONE_RE.search(phone):
+        return False, "Unable to parse phone number"
+    
+    import phonenumbers  # lazy: only paid when a phone number is actually validated
     
     try:
         parsed_number = phonenumbers.parse(phone, None)
         is_valid = phonenumbers.is_valid_number(parsed_number)
-        
-        return {
-            "is_valid": is_valid,
-            "message": "Phone number is valid" if is_valid else "Invalid phone number format"
-        }
-            
+        return is_valid, "Phone number is valid" if is_valid else "Invalid phone number format"
     except phonenumbers.NumberParseException:
-        return {
-            "is_valid": False,
-            "message": "Unable to parse phone number"
-        }
+        return False, "Unable to parse phone number"
+
+# field_name -> validator(value, product_details, request_type); fields not listed are accepted as-is
+_VALIDATORS = {
+    "unit": lambda v, pd, rt: validate_unit({"unit": v}),
+    "quantity": lambda v, pd, rt: validate_quantity({"quantity": v}, pd, rt),
+    "delivery_date": lambda v, pd, rt: validate_date({"delivery_date": v}),
+    "phone": lambda v, pd, rt: validate_phone({"phone": v}),
+    "incoterm": lambda v, pd, rt: validate_selection({"field_name": "incoterm", "selected_value": v}),
+    "mode_of_payment": lambda v, pd, rt: validate_selection({"field_name": "mode_of_payment", "selected_value": v}),
+    "packaging_pref": lambda v, pd, rt: validate_selection({"field_name": "packaging_pref", "selected_value": v})
+}
+
+def validate_field(field_name: str, field_value, product_details: dict, request_type: str) -> dict:
+    """Validate one extracted field value"""
+    validator = _VALIDATORS.get(field_name)
+    if validator is None:
+        return {"is_valid": True, "message": f"{field_name} value accepted"}
+    return validator(field_value, product_details, request_type)
 
 def calculate_expected_price(args: dict) -> dict:
     """Calculate expected price from quantity and price per unit"""
@@ -586,10 +665,9 @@ def calculate_expected_price(args: dict) -> dict:
             "status": "error"
         }
 
-def check_completion_status(args: dict, required_fields: list) -> dict:
+def check_completion_status(product_details: dict, required_fields: list) -> dict:
     """Check if all required fields are completed"""
-    completed_fields = args["completed_fields"]
-    pending_fields = [f for f in required_fields if f not in completed_fields]
+    completed_fields, pending_fields = split_fields_by_completion(product_details, required_fields)
     
     return {
         "all_completed": len(pending_fields) == 0,
@@ -599,45 +677,32 @@ def check_completion_status(args: dict, required_fields: list) -> dict:
     }
 
 # Helper Functions
-def get_required_fields(request_type: str) -> list:
+def get_required_fields(request_type: str) -> tuple:
     """Get required fields based on request type"""
-    # Convert to lowercase for consistent comparison
-    request_type_lower = request_type.lower()
-    
-    # Map request types to their required fields
-    field_requirements = {
-        "order":  ["unit", "quantity", "price_per_unit", "expected_price", "phone", "incoterm", "mode_of_payment", "packaging_pref", "delivery_date"],
-        "sample": ["unit", "quantity", "price_per_unit", "expected_price", "phone", "incoterm", "mode_of_payment", "packaging_pref", "delivery_date"],
-        "quote":  ["unit", "quantity", "price_per_unit", "expected_price", "phone", "incoterm", "mode_of_payment", "packaging_pref", "delivery_date"],  
-        "ppr":    ["unit", "quantity", "price_per_unit", "expected_price", "delivery_date"]  # PPR has different requirements
-    }
-    
     # Return fields for the specific request type, or base fields if not found
-    return field_requirements.get(request_type_lower, ["unit", "quantity", "price_per_unit", "expected_price"])
+    return REQUIRED_FIELDS.get(request_type.lower(), DEFAULT_REQUIRED_FIELDS)
+
+_EMPTY_FIELD_VALUES = (None, "", 0, "0")
 
 def get_completed_fields(product_details: dict, required_fields: list) -> list:
     """Get list of completed fields"""
-    completed = []
+    return split_fields_by_completion(product_details, required_fields)[0]
+
+def split_fields_by_completion(product_details: dict, required_fields: list) -> tuple:
+    """Split required fields into (completed, pending) in one pass over the session values"""
+    completed, pending = [], []
     for field in required_fields:
-        value = product_details.get(field)
-        if value not in [None, "", 0, "0"]:
+        if product_details.get(field) in _EMPTY_FIELD_VALUES:
+            pending.append(field)
+        else:
             completed.append(field)
-    return completed
+    return completed, pending
 
-def build_system_prompt(session_data: dict, required_fields: list, completed_fields: list, pending_fields: list) -> str:
-    """Build comprehensive system prompt for BULK PROCESSING"""
-    request_type = session_data.get("request", "").upper()
-    product_details = session_data.get("product_details", {})
-    
-    # ADD SPECIAL NOTE FOR SAMPLE QUANTITIES
-    sample_note = ""
-    if request_type.lower() == "sample":
-        sample_note = "\n🚨 **SPECIAL SAMPLE RULE**: For sample requests, ANY quantity is allowed (even very small amounts like 0.01, 0.5, etc.) as long as it doesn't exceed maximum stock. NO minimum quantity requirement for samples!"
-    
-    prompt = f"""You are a **Request Details Specialist** for chemical product orders.
+# Static skeleton of the agent 2 system prompt, parsed once at import - only the $slots change per turn
+_SYSTEM_PROMPT_TEMPLATE = Template("""You are a **Request Details Specialist** for chemical product orders.
 You are the second agent in a triple-agent system where you collect and validate all necessary details for processing user requests.
 The first agent has already provided the product and request type. and after your completion, you will hand over to the third agent who manages address and purpose by changing the session's agent to "address_purpose".
-Your job is to collect and validate all required details for a {request_type} request.
+Your job is to collect and validate all required details for a $request_type request.
 Always respond with a markdown formatted message with proper line breaks but no text enlargement (headings).
 
 🚨 **IMPORTANT UNIT POLICY**: 
@@ -650,14 +715,14 @@ Always respond with a markdown formatted message with proper line breaks but no
 
 
 PRODUCT INFORMATION:
-- Product: {session_data.get('product_name', 'N/A')}
-- Request Type: {request_type}
-- Available Stock: {product_details.get('maxQuantity', 'N/A')}
-- Minimum Order: {product_details.get('minQuantity', 'N/A')}
-{sample_note}
+- Product: $product_name
+- Request Type: $request_type
+- Available Stock: $max_quantity
+- Minimum Order: $min_quantity
+$sample_note
 
-ALL REQUIRED FIELDS for {request_type}:
-{format_fields_info(required_fields, session_data)}
+ALL REQUIRED FIELDS for $request_type:
+$fields_info
 
 FIELD OPTIONS:
 • Unit: KG (kilogram), GAL (gallon), LB (pound), L (liter) (user MUST choose one)
@@ -666,9 +731,12 @@ FIELD OPTIONS:
 - Packaging: 1. Bulk Tanker (in Truck), 2. PP Bag, 3. Jerry Can, 4. Drum
 - PPR requests Do not need Incoterm, Payment Method or Packaging preferece. So if user is placing a PPR. Never ask these fields. But if user is requesting Order/Sample/Quotation ask them.
 CURRENT PROGRESS:
-Completed: {len(completed_fields)}/{len(required_fields)} fields
-{format_progress(completed_fields, pending_fields, product_details)}
+Completed: $completed_count/$required_count fields
+$progress
+""")
 
+# Static remainder of the prompt (no placeholders) - appended as-is rather than scanned by Template
+_SYSTEM_PROMPT_TAIL = """
 🚀 **BULK PROCESSING STRATEGY:**
 
 1. **FIRST MESSAGE**: Show ALL missing fields and invite user to provide them in any format.
@@ -694,66 +762,140 @@ example:
 - ALWAYS include Unit in the required fields list if not completed
 - Extract ALL possible values from user messages (even if you asked for specific field)
 - Validate silently in background
-- If validation fails, mention ONLY the invalid fields, after user corrects or updates any value, explicitly call update_validated_field tool for that field only
+- If validation fails, mention ONLY the invalid fields, after user corrects or updates any value, call extract_and_validate_all_fields with that field only
 - Keep conversation flowing naturally
-- Calculate expected_price automatically when both quantity and price_per_unit are provided and show in next message.
+- expected_price is calculated by extract_and_validate_all_fields when both quantity and price_per_unit are known, never calculate it yourself; show it in next message.
 - All prices will be in Bangladeshi Taka. If user provides price in other currency, NEVER convert it to Bangladeshi Taka. Ask user to provide price converted in Bangladeshi Taka only. And if no currency mentioned, assume Bangladeshi Taka. Never Ever Convert Prices Yourself. Users will definitely try to cheat you with wrong conversion rates. Always ask for bangladeshi taka price Upfront (converted from User side)
 - When all fields are validated then show the list of all the fields with their values before asking for final confirmation before updating session.
 - before you have updated the agent to "address_purpose", confirm with user that all details are correct by final confirmation and ask them to confirm to continue. Before final confirmation from user side, you can change the details of the required fields only if user asks to.
-- When all fields complete, ask for check completion_status and hand over. Do not mention about changing agent to "address_purpose" to user.
+- When all fields complete and the user gave final confirmation, call check_completion_status to hand over. Do not mention about changing agent to "address_purpose" to user.
 **LIMITATIONS:**
 - You are unable to update any details except the required fields, if user asks to change other details (selected product or request(sample,order, quote)), politely refuse and tell them to refresh the session to start a new order.
-- If user asks to change any of the already validated fields before final confirmation, you have to change them, and update the session memory accordingly by calling update_validated_field tool for each changed field. Do not update the agent to "address_purpose" until all fields are finalized in the session memory.
+- If user asks to change any of the already validated fields before final confirmation, you have to change them, and update the session memory accordingly by calling extract_and_validate_all_fields with the changed fields. Do not update the agent to "address_purpose" until all fields are finalized in the session memory.
 - After final confirmation from user side, and changing the session's agent to "address_purpose", you cannot make any more changes or place new orders. Because the third agent has taken over the chat. If the user still asks then tell them to refresh the session to start a new order.
 
 **TOOLS AVAILABLE:**
-- extract_and_validate_all_fields: Extract and validate ALL fields from user message (PREFERRED)
-- validate_individual_field: Validate single field
-- calculate_expected_price: Always Compute total price from quantity * price per unit using this tool only, not by yourself, always show  the response of calculated_expected_price tool
-- update_validated_field: Store validated field
-- check_completion_status: Verify completion
+- extract_and_validate_all_fields: Extract, validate and store fields from user message (also for corrections); returns the calculated expected_price, always show it
+- check_completion_status: Verify completion and hand over (no arguments)
 
 **START NOW: Show all missing fields and invite bulk input.**"""
 
-    return prompt
+# SPECIAL NOTE FOR SAMPLE QUANTITIES
+_SAMPLE_NOTE = "\n🚨 **SPECIAL SAMPLE RULE**: For sample requests, ANY quantity is allowed (even very small amounts like 0.01, 0.5, etc.) as long as it doesn't exceed maximum stock. NO minimum quantity requirement for samples!"
 
-def format_fields_info(required_fields: list, session_data: dict) -> str:
-    """Format field information for prompt"""
+def build_system_prompt(session_data: dict, required_fields: list, completed_fields: list, pending_fields: list) -> str:
+    """Build comprehensive system prompt for BULK PROCESSING"""
     product_details = session_data.get("product_details", {})
-    request_type = session_data.get("request", "").lower()
-    
-    field_descriptions = {
-        "unit": "Unit of measurement • KG • GAL • LB • L (choose one)",
-        "price_per_unit": "Your offered price per unit in Bangladeshi Taka",
-        "expected_price": "Total expected price (auto-calculated)",
-        "phone": "Contact phone number (international format: +(country code)(phone number))",
-        "incoterm": "Delivery terms (1. Ex Factory [ex works or Delivery From Factory] or 2. Deliver to Buyer Factory)",
-        "mode_of_payment": "Payment method (1. LC (Letter of Credit), 2. TT (Telegraphic or Bank Transfer), 3. Cash)",
-        "packaging_pref": "Packaging preference (1. Bulk Tanker (in Truck), 2. PP Bag, 3. Jerry Can, 4. Drum)",
-        "delivery_date": f"Delivery date (after {datetime.now().strftime('%Y-%m-%d')}, YYYY-MM-DD format)"
-    }
+    key = (
+        session_data.get("request", "").lower(),
+        session_data.get('product_name', 'N/A'),
+        product_details.get('maxQuantity'),
+        product_details.get('minQuantity'),
+        tuple(required_fields),
+        tuple((field, product_details.get(field, "")) for field in completed_fields),
+        tuple(pending_fields),
+        _today_str()  # the field list shows today's date
+    )
+    try:
+        return _build_system_prompt_cached(*key)
+    except TypeError:
+        # Unhashable value in product_details - render without caching
+        return _build_system_prompt_cached.__wrapped__(*key)
+
+@lru_cache(maxsize=256)
+def _build_system_prompt_cached(request_type_lower: str, product_name, max_quantity, min_quantity,
+                                required_fields: tuple, completed_items: tuple, pending_fields: tuple,
+                                today: str) -> str:
+    """
+    Render the system prompt from hashable inputs. The prompt only changes when a field
+    flips, so most turns of a session reuse the exact same string (and the provider's
+    prompt-prefix cache hits on it).
+    """
+    request_type = request_type_lower.upper()
+    completed_fields = [field for field, _ in completed_items]
     
+    prompt = _SYSTEM_PROMPT_TEMPLATE.substitute(
+        request_type=request_type,
+        product_name=product_name,
+        max_quantity='N/A' if max_quantity is None else max_quantity,
+        min_quantity='N/A' if min_quantity is None else min_quantity,
+        sample_note=_SAMPLE_NOTE if request_type_lower == "sample" else "",
+        fields_info=format_fields_info(required_fields, request_type_lower, max_quantity, min_quantity),
+        completed_count=len(completed_fields),
+        required_count=len(required_fields),
+        progress=format_progress(completed_fields, pending_fields, dict(completed_items))
+    ) + _SYSTEM_PROMPT_TAIL
+
+    return prompt
+
+# Today's date (and its YYYY-MM-DD form), recomputed at most once per wall-clock second
+_TODAY_CACHE = {"second": None, "date": None, "str": None}
+
+def _today() -> date:
+    second = int(time.time())
+    if _TODAY_CACHE["second"] != second:
+        today = date.today()
+        _TODAY_CACHE.update(second=second, date=today, str=today.isoformat())
+    return _TODAY_CACHE["date"]
+
+def _today_str() -> str:
+    _today()
+    return _TODAY_CACHE["str"]
+
+# Static field descriptions for the prompt (quantity and delivery_date are built per call).
+# Enum options are listed once, in the FIELD OPTIONS block right below this list in the prompt.
+_FIELD_DESCRIPTIONS = {
+    "unit": "Unit of measurement (choose one, see FIELD OPTIONS)",
+    "price_per_unit": "Your offered price per unit in Bangladeshi Taka",
+    "expected_price": "Total expected price (auto-calculated)",
+    "phone": "Contact phone number (international format: +(country code)(phone number))",
+    "incoterm": "Delivery terms (see FIELD OPTIONS)",
+    "mode_of_payment": "Payment method (see FIELD OPTIONS)",
+    "packaging_pref": "Packaging preference (see FIELD OPTIONS)"
+}
+
+# Quantity description per request type (samples have no minimum)
+_QUANTITY_DESCRIPTIONS = {
+    "sample": "Sample quantity required (any amount up to {max} - no minimum for samples)"
+}
+_DEFAULT_QUANTITY_DESCRIPTION = "Quantity required (≥{min} and ≤{max})"
+
+def format_fields_info(required_fields: list, request_type: str, max_quantity=None, min_quantity=None) -> str:
+    """Format field information for prompt (request_type lowercase, quantities as read from product_details)"""
+    return _format_fields_info_cached(
+        request_type,
+        tuple(required_fields),  # no-op for the frozen tuples from get_required_fields
+        'available' if max_quantity is None else max_quantity,
+        1 if min_quantity is None else min_quantity,
+        _today_str()  # part of the key so the cached text never shows a stale date
+    )
+
+@lru_cache(maxsize=128)
+def _format_fields_info_cached(request_type: str, required_fields: tuple, max_quantity, min_quantity, today: str) -> str:
+    """Cached body of format_fields_info - inputs rarely change within a session"""
     # SPECIAL HANDLING FOR QUANTITY FIELD BASED ON REQUEST TYPE
-    if request_type == "sample":
-        field_descriptions["quantity"] = f"Sample quantity required (any amount up to {product_details.get('maxQuantity', 'available')} - no minimum for samples)"
-    else:
-        field_descriptions["quantity"] = f"Quantity required (≥{product_details.get('minQuantity', 1)} and ≤{product_details.get('maxQuantity', 'available')})"
+    quantity_description = _QUANTITY_DESCRIPTIONS.get(request_type, _DEFAULT_QUANTITY_DESCRIPTION).format(
+        min=min_quantity, max=max_quantity
+    )
     
-    return "\n".join([f"- {field}: {field_descriptions.get(field, field)}" for field in required_fields])
+    dynamic_get = {
+        "quantity": quantity_description,
+        "delivery_date": f"Delivery date (after {today}, YYYY-MM-DD format)"
+    }.get
+    static_get = _FIELD_DESCRIPTIONS.get  # bound once instead of a global + attribute lookup per field
+    return "\n".join(f"- {field}: {dynamic_get(field) or static_get(field, field)}" for field in required_fields)
 
 def format_progress(completed_fields: list, pending_fields: list, product_details: dict) -> str:
     """Format progress information"""
-    lines = []
-    
-    if completed_fields:
-        lines.append("✅ Completed:")
-        for field in completed_fields:
-            value = product_details.get(field, "")
-            lines.append(f"  - {field}: {value}")
-    
-    if pending_fields:
-        lines.append("📋 Still needed:")
-        for field in pending_fields:
-            lines.append(f"  - {field}")
+    def _progress_lines():
+        if completed_fields:
+            yield "✅ Completed:"
+            for field in completed_fields:
+                yield f"  - {field}: {product_details.get(field, '')}"
+        
+        if pending_fields:
+            yield "📋 Still needed:"
+            for field in pending_fields:
+                yield f"  - {field}"
     
-    return "\n".join(lines) if lines else "No fields completed yet."
\ No newline at end of file
+    return "\n".join(_progress_lines()) or "No fields completed yet."
@@ -0,0 +1,150 @@
+# agents/request_details_batch.py
+# Offline / non-interactive path for agent 2 (backfills, re-validation, eval runs).
+# Sends many independent sessions through OpenAI's Batch API: 50% cheaper and a separate
+# rate-limit pool, but results can take up to 24h - NEVER use this for live chat.
+# OpenRouter has no Batch API, so this talks to OpenAI directly with OPENAI_API_KEY.
+import asyncio
+import logging
+import os
+from functools import lru_cache
+from openai import AsyncOpenAI
+import orjson
+from dotenv import load_dotenv
+from agents.request_details import (
+    HISTORY_EXCHANGES,
+    TOOLS,
+    build_system_prompt,
+    get_required_fields,
+    split_fields_by_completion,
+    validate_extracted_fields,
+)
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BATCH_MODEL = "gpt-4o"  # OpenAI model id (no "openai/" OpenRouter prefix)
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+@lru_cache(maxsize=1)
+def get_batch_client() -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+def build_batch_line(custom_id: str, user_input: str, session_data: dict) -> dict:
+    """Build one Batch API request line - same prompt, history and tools as the live path"""
+    request_type = session_data.get("request", "").lower()
+    product_details = session_data.get("product_details", {})
+
+    required_fields = get_required_fields(request_type)
+    completed_fields, pending_fields = split_fields_by_completion(product_details, required_fields)
+
+    messages = [
+        {"role": "system", "content": build_system_prompt(session_data, required_fields, completed_fields, pending_fields)}
+    ]
+    for entry in session_data.get("history", [])[-HISTORY_EXCHANGES:]:
+        messages.append({"role": "user", "content": entry["user"]})
+        messages.append({"role": "assistant", "content": entry["agent"]})
+    messages.append({"role": "user", "content": user_input})
+
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": BATCH_MODEL,
+            "messages": messages,
+            "max_tokens": 1000,
+            "tools": TOOLS,
+            "tool_choice": "auto"
+        }
+    }
+
+async def wait_for_batch(batch_id: str, poll_interval: float = 30.0):
+    """Poll a batch until it reaches a terminal status"""
+    client = get_batch_client()
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_BATCH_STATUSES:
+            return batch
+        logger.info("⏳ Batch %s status: %s", batch_id, batch.status)
+        await asyncio.sleep(poll_interval)
+
+async def process_request_details_batch(items: list, poll_interval: float = 30.0) -> dict:
+    """
+    Run many (custom_id, user_input, session_data) items through the Batch API.
+    Returns { custom_id: {"response": str, "tool_calls": list} } or { custom_id: {"error": ...} }.
+    Tool calls are returned raw - the caller decides which validators to apply offline.
+    """
+    if not items:
+        return {}
+
+    client = get_batch_client()
+    jsonl = b"\n".join(
+        orjson.dumps(build_batch_line(custom_id, user_input, session_data))
+        for custom_id, user_input, session_data in items
+    )
+
+    input_file = await client.files.create(
+        file=("request_details_batch.jsonl", jsonl),
+        purpose="batch"
+    )
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    logger.info("📦 Submitted batch %s with %d requests", batch.id, len(items))
+
+    batch = await wait_for_batch(batch.id, poll_interval)
+    if batch.status != "completed":
+        logger.error("❌ Batch %s ended with status %s", batch.id, batch.status)
+        return {custom_id: {"error": f"batch {batch.status}"} for custom_id, _, _ in items}
+
+    results = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        content = await client.files.content(file_id)
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            custom_id = record["custom_id"]
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                results[custom_id] = {"error": record.get("error") or response.get("body")}
+                continue
+            message = response["body"]["choices"][0]["message"]
+            results[custom_id] = {
+                "response": message.get("content") or "",
+                "tool_calls": message.get("tool_calls") or []
+            }
+
+    return results
+
+def apply_batch_tool_calls(result: dict, session_data: dict) -> dict:
+    """
+    Run the bulk-extraction tool calls of one batch result through the same validators
+    as the live path. Returns the validated session updates (nothing is saved here).
+    """
+    request_type = session_data.get("request", "").lower()
+    product_details = session_data.get("product_details", {})
+    session_updates = {}
+
+    for tool_call in result.get("tool_calls", []):
+        function = tool_call.get("function", {})
+        if function.get("name") != "extract_and_validate_all_fields":
+            continue
+        try:
+            function_args = orjson.loads(function.get("arguments") or "{}")
+        except orjson.JSONDecodeError:
+            logger.warning("⚠️ Skipping batch tool call with invalid arguments: %s", tool_call.get("id"))
+            continue
+        _, updates = validate_extracted_fields(
+            function_args.get("extracted_fields", {}),
+            product_details,
+            function_args.get("request_type", request_type)
+        )
+        session_updates.update(updates)
+
+    return session_updates
@@ -1,17 +1,18 @@
-import requests
-import json
+import httpx
 
 def test_chatbot():
     url = ""
-    
+
     payload = {
         "sessionId": "test-session-123",
-        "userAuth": "test-user", 
+        "userAuth": "test-user",
         "message": "i want sulphuric acid"
     }
-    
+
     try:
-        response = requests.post(url, json=payload)
+        # httpx is already a backend dependency; a Client keeps the connection alive between posts
+        with httpx.Client(timeout=60.0) as client:
+            response = client.post(url, json=payload)
         print("Status:", response.status_code)
         print("Response:", response.json())
     except Exception as e:
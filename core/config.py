@@ -6,5 +6,7 @@ load_dotenv()
 class Settings:
     MONGO_URI: str = os.getenv("MONGO_URI")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", "falcon_chatbot")
+    # Max pooled connections to the order API (0 = unbounded, aiohttp's default is 100)
+    ORDER_HTTP_LIMIT: int = int(os.getenv("ORDER_HTTP_LIMIT", "0"))
 
 settings = Settings()
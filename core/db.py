@@ -3,3 +3,11 @@ from core.config import settings
 
 client = AsyncIOMotorClient(settings.MONGO_URI)
 db = client[settings.DATABASE_NAME]
+
+# Agent sessions expire 1 day after their last update (was a delete_many sweep on every message)
+AGENT_SESSION_TTL_SECONDS = 24 * 60 * 60
+
+async def ensure_indexes():
+    """Create indexes the app relies on - safe to call on every startup"""
+    # MongoDB's TTL monitor reaps expired sessions in the background
+    await db.agent_sessions.create_index("last_updated", expireAfterSeconds=AGENT_SESSION_TTL_SECONDS)
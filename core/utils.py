@@ -1,112 +1,260 @@
 # core/utils.py also manages translation with enhanced logging
 # 25 translation request per minute, with a queue to avoid IP getting blocked by google
+import atexit
 import logging
+import queue
 import re
+import sys
 import json
 import asyncio
 import time
-from collections import deque
-from deep_translator import GoogleTranslator
-from typing import Optional, Dict, Any, Tuple, List
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple, List
 import colorama
 from colorama import Fore, Back, Style
-import datetime
+import os
 
-# Initialize colorama for colored logging
-colorama.init(autoreset=True)
+if TYPE_CHECKING:
+    from deep_translator import GoogleTranslator
 
-# Set up enhanced logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+# ANSI colours only help on a terminal - when logs go to a file/journald every Fore/Style
+# code becomes an empty string, so no escape bytes are formatted or written
+LOG_COLORS = sys.stderr.isatty()
+
+class _NoColor:
+    """Stand-in for colorama's Fore/Back/Style with every colour blank"""
+    def __getattr__(self, name: str) -> str:
+        return ''
+
+if LOG_COLORS:
+    # Initialize colorama for colored logging
+    colorama.init(autoreset=True)
+else:
+    Fore = Back = Style = _NoColor()
+
+# Set up enhanced logging (LOG_LEVEL=DEBUG in .env to see per-turn agent debug logs)
+# Handlers only enqueue records; a listener thread does the actual stdout writes,
+# so a slow terminal/pipe never blocks the event loop
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     datefmt='%H:%M:%S'
+))
+_log_listener = QueueListener(_log_queue, _log_stream_handler)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format='%(message)s',  # the full format is applied by the listener's handler
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+# Max entries in TranslationManager's translation cache
+TRANSLATION_CACHE_SIZE = 4096
+
+# Queued requests for the same language pair are joined into one upstream call,
+# up to this many requests / characters (Google rejects texts over 5000 characters)
+TRANSLATION_BATCH_SIZE = 32
+TRANSLATION_BATCH_MAX_CHARS = 4500
+# Each batched text is numbered ("[[0]] ...", "[[1]] ...") so the reply can be checked
+# segment by segment before it is handed back to (possibly different) sessions
+_BATCH_MARKER = "[[%d]] "
+_BATCH_JOINER = "\n\n"
+_BATCH_MARKER_RE = re.compile(r'\[\[\s*(\d+)\s*\]\]')
+# Worst-case characters added per text by its marker and the joiner
+_BATCH_OVERHEAD = len(_BATCH_MARKER % TRANSLATION_BATCH_SIZE) + len(_BATCH_JOINER)
+
+def _join_batch(texts: List[str]) -> str:
+    """Number and join texts for a single upstream call"""
+    return _BATCH_JOINER.join(_BATCH_MARKER % index + text for index, text in enumerate(texts))
+
+def _split_batch(translated: str, count: int) -> Optional[List[str]]:
+    """Split a batched translation back into its texts, or None unless every marker came back once and in order"""
+    parts = _BATCH_MARKER_RE.split(translated)
+    # parts = [before first marker, "0", text 0, "1", text 1, ...]
+    if parts[0].strip() or parts[1::2] != [str(index) for index in range(count)]:
+        return None
+    return [part.strip() for part in parts[2::2]]
+
+# Log separators, built once
+_DASHES = "-" * 60
+_RULE = "=" * 70
+
+def _translation_flow_formats(color: str) -> Tuple[str, str, str, str, str]:
+    """Pre-composed (header, memory, original, translated, footer) log formats with colours baked in"""
+    return (
+        color + "🔄 TRANSLATION FLOW [%s → %s]%s",
+        color + "   🧠 TRANSLATION MEMORY APPLIED: %s",
+        color + "   Original (%s): " + Fore.WHITE + "\"%s\"",
+        color + "   Translated (%s): " + Fore.WHITE + "\"%s\"",
+        color + _DASHES
+    )
+
+_TO_ENGLISH_FLOW_FORMATS = _translation_flow_formats(Fore.BLUE)
+_FROM_ENGLISH_FLOW_FORMATS = _translation_flow_formats(Fore.MAGENTA)
+
 class TranslationQueue:
     """
     Manages translation requests with queuing and rate limiting
-    Prevents parallel requests and enforces max 25 translations per minute
+    Runs at most `concurrency` requests in parallel and enforces max 25 translations per minute
     """
     
-    def __init__(self, max_requests_per_minute: int = 25):
+    def __init__(self, max_requests_per_minute: int = 25, concurrency: int = 3):
         self.max_requests_per_minute = max_requests_per_minute
-        self.request_times = deque()
+        self.concurrency = concurrency
+        # Token bucket: holds up to a minute's worth of requests, refilled continuously
+        self.refill_rate = max_requests_per_minute / 60.0
+        self.tokens = float(max_requests_per_minute)
+        self.last_refill = time.monotonic()
+        # One GoogleTranslator per (source, target) pair instead of one per request
+        self.translators: Dict[Tuple[str, str], "GoogleTranslator"] = {}
         self.queue = asyncio.Queue()
         self.processing = False
         self.processing_lock = asyncio.Lock()
-        self.worker_task = None
-        self.start_worker()
+        # Caps upstream calls in flight across all workers
+        self.upstream_semaphore = asyncio.Semaphore(concurrency)
+        # Workers are started by the first request - there is no running loop at import time
+        self.worker_tasks = []
     
     def start_worker(self):
-        """Start the background worker to process translation requests"""
-        if self.worker_task is None or self.worker_task.done():
-            self.worker_task = asyncio.create_task(self._process_queue())
+        """Start the background workers to process translation requests"""
+        # All workers share the token bucket, so parallelism never exceeds the per-minute budget
+        self.worker_tasks = [task for task in self.worker_tasks if not task.done()]
+        while len(self.worker_tasks) < self.concurrency:
+            self.worker_tasks.append(asyncio.create_task(self._process_queue()))
     
     async def _process_queue(self):
         """Background worker to process translation requests from the queue"""
         while True:
             try:
-                # Get next request from queue
-                future, source_lang, target_lang, text, session_id = await self.queue.get()
-                
-                # Wait for rate limiting
-                await self._wait_for_rate_limit()
-                
-                # Perform the translation
-                try:
-                    if source_lang == 'en':
-                        result = GoogleTranslator(source='en', target=target_lang).translate(text)
-                    else:
-                        result = GoogleTranslator(source=source_lang, target='en').translate(text)
-                    
-                    # Set the result
-                    future.set_result(result)
-                    
-                except Exception as e:
-                    # Set exception if translation fails
-                    future.set_exception(e)
-                
-                # Mark task as done
-                self.queue.task_done()
+                # Get next request from queue, plus whatever else is already waiting
+                batch = [await self.queue.get()]
+            except asyncio.CancelledError:
+                break
+            while len(batch) < TRANSLATION_BATCH_SIZE and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            
+            try:
+                # One group per language pair - each group is translated with as few calls as possible
+                groups = {}
+                for request in batch:
+                    groups.setdefault((request[1], request[2]), []).append(request)
                 
-                # Update rate limiting
-                self._update_request_times()
+                await asyncio.gather(*(
+                    self._translate_group(source_lang, target_lang, requests)
+                    for (source_lang, target_lang), requests in groups.items()
+                ))
                 
             except asyncio.CancelledError:
+                for future, *_ in batch:
+                    future.cancel()
                 break
             except Exception as e:
-                logger.error(f"{Fore.RED}❌ Translation queue worker error: {e}")
+                logger.error("%s❌ Translation queue worker error: %s", Fore.RED, e)
+                # Never leave a caller waiting on a request this batch did not resolve
+                for future, *_ in batch:
+                    if not future.done():
+                        future.set_exception(e)
                 await asyncio.sleep(1)  # Prevent tight loop on errors
+            finally:
+                # Mark tasks as done
+                for _ in batch:
+                    self.queue.task_done()
+    
+    async def _translate_group(self, source_lang: str, target_lang: str, requests: List[tuple]):
+        """Translate queued requests sharing a language pair and resolve their futures"""
+        for chunk in self._chunk_requests(requests):
+            texts = [request[3] for request in chunk]
+            try:
+                if source_lang == 'en':
+                    google_translator = self._get_translator('en', target_lang)
+                else:
+                    google_translator = self._get_translator(source_lang, 'en')
+                
+                if len(texts) == 1:
+                    results = [await self._translate_text(google_translator, texts[0])]
+                else:
+                    joined = await self._translate_text(google_translator, _join_batch(texts))
+                    results = _split_batch(joined, len(texts))
+                    if results is None:
+                        # The numbering did not survive translation - translate one by one instead
+                        logger.warning("%s⚠️  Batched translation lost its segment markers for %d texts, retrying individually", Fore.YELLOW, len(texts))
+                        results = [await self._translate_text(google_translator, text) for text in texts]
+                    else:
+                        logger.info("%s📦 Translated %d queued texts in one request [%s → %s]", Fore.CYAN, len(texts), source_lang.upper(), target_lang.upper())
+            except Exception as e:
+                # Set exception if translation fails
+                for future, *_ in chunk:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            # Set the results
+            for (future, *_), result in zip(chunk, results):
+                if not future.done():
+                    future.set_result(result)
+    
+    @staticmethod
+    def _chunk_requests(requests: List[tuple]):
+        """Split requests into runs that fit into a single upstream call"""
+        chunk, chunk_chars = [], 0
+        for request in requests:
+            text_chars = len(request[3]) + _BATCH_OVERHEAD
+            if chunk and chunk_chars + text_chars > TRANSLATION_BATCH_MAX_CHARS:
+                yield chunk
+                chunk, chunk_chars = [], 0
+            chunk.append(request)
+            chunk_chars += text_chars
+        if chunk:
+            yield chunk
+    
+    async def _translate_text(self, google_translator: "GoogleTranslator", text: str) -> str:
+        """One rate-limited upstream call (blocking HTTP - run it off the event loop)"""
+        await self._wait_for_rate_limit()
+        async with self.upstream_semaphore:
+            return await asyncio.to_thread(google_translator.translate, text)
+    
+    def _refill_tokens(self):
+        """Add the tokens earned since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.max_requests_per_minute, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
     
     async def _wait_for_rate_limit(self):
-        """Wait if we've reached the rate limit"""
+        """Wait until the bucket has a token, then take it"""
         while True:
-            now = time.time()
-            
-            # Remove requests older than 1 minute
-            while self.request_times and self.request_times[0] < now - 60:
-                self.request_times.popleft()
+            self._refill_tokens()
             
             # Check if we can proceed
-            if len(self.request_times) < self.max_requests_per_minute:
-                break
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
             
-            # Wait for the oldest request to expire
-            wait_time = self.request_times[0] - (now - 60)
-            if wait_time > 0:
-                logger.info(f"{Fore.YELLOW}⏳ Rate limit reached. Waiting {wait_time:.1f}s...")
-                await asyncio.sleep(wait_time)
+            # Wait for the next token
+            wait_time = (1 - self.tokens) / self.refill_rate
+            logger.info("%s⏳ Rate limit reached. Waiting %.1fs...", Fore.YELLOW, wait_time)
+            await asyncio.sleep(wait_time)
     
-    def _update_request_times(self):
-        """Update the request times for rate limiting"""
-        now = time.time()
-        self.request_times.append(now)
+    def _get_translator(self, source_lang: str, target_lang: str) -> "GoogleTranslator":
+        """Reuse one translator instance per language pair"""
+        google_translator = self.translators.get((source_lang, target_lang))
+        if google_translator is None:
+            # deep_translator pulls in requests/bs4 - only pay for it once a translation is needed
+            from deep_translator import GoogleTranslator
+            google_translator = GoogleTranslator(source=source_lang, target=target_lang)
+            self.translators[(source_lang, target_lang)] = google_translator
+        return google_translator
     
     async def add_translation_request(self, source_lang: str, target_lang: str, text: str, session_id: str = "") -> str:
         """
         Add a translation request to the queue and wait for result
         """
+        # (Re)start any missing workers
+        self.start_worker()
+        
         # Create a future for the result
         future = asyncio.Future()
         
@@ -116,19 +264,23 @@ class TranslationQueue:
         # Log queue status
         queue_size = self.queue.qsize()
         if queue_size > 0:
-            logger.info(f"{Fore.CYAN}📊 Translation queue size: {queue_size} | Session: {session_id}")
+            logger.info("%s📊 Translation queue size: %d | Session: %s", Fore.CYAN, queue_size, session_id)
         
         # Wait for the result
         return await future
     
     def get_queue_stats(self) -> Dict[str, Any]:
         """Get current queue statistics"""
+        self._refill_tokens()
         return {
             'queue_size': self.queue.qsize(),
-            'recent_requests': len(self.request_times),
+            'available_tokens': int(self.tokens),
             'max_requests_per_minute': self.max_requests_per_minute
         }
 
+# Pattern to match fields like name_bn, description_bn, specification_bn, etc.
+_LANGUAGE_FIELD_RE = re.compile(r'(name|description|specification|brand)_(en|ar|bn)\s*:\s*"([^"]*)"', re.IGNORECASE)
+
 class TranslationManager:
     """
     Handles translation between English, Arabic, and Bengali
@@ -141,91 +293,71 @@ class TranslationManager:
             'ar': {'name': 'arabic', 'color': Fore.CYAN}, 
             'bn': {'name': 'bengali', 'color': Fore.YELLOW}
         }
-        self._current_source_lang = None
-        self._current_target_lang = None
+        # Coloured language tags for the logs, built once
+        self._language_displays = {
+            lang_code: f"{lang_info['color']}{lang_code.upper()}{Style.RESET_ALL}"
+            for lang_code, lang_info in self.supported_languages.items()
+        }
         
         # Initialize translation memory - ARABIC ONLY
         self._translation_memory = self._initialize_translation_memory()
+        self._compile_translation_memory()
         
         # Initialize translation queue
         self.translation_queue = TranslationQueue(max_requests_per_minute=25)
+        
+        # LRU of (source, target, stripped text) -> final translation (after memory corrections
+        # and field restoring). Chat UIs repeat a lot ("yes", "1", option menus) and a hit skips
+        # the queue, the rate limit and the network round-trip.
+        self._translation_cache: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        # Same key -> translation currently running, so concurrent identical requests share one call
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Task] = {}
     
-    def _initialize_translation_memory(self) -> Dict[str, Dict[str, str]]:
+    def _initialize_translation_memory(self) -> Dict[str, str]:
         """
         Initialize translation memory with industry-specific terms - ARABIC ONLY
-        Structure: { 'english_term': { 'ar': 'arabic_translation' } }
+        Structure: { 'english_term': 'arabic_translation' }
         """
         return {
-            '<!-- R3S3T_S322I0N -->': {
-            'ar': '<!-- R3S3T_S322I0N -->',
-            'bn': '<!-- R3S3T_S322I0N -->', 
-            'en': '<!-- R3S3T_S322I0N -->'
-            },
+            '<!-- R3S3T_S322I0N -->': '<!-- R3S3T_S322I0N -->',
             # Client-provided Arabic translations
-            'sample': {
-                'ar': 'العينة'
-            },
-            'order': {
-                'ar': 'الطلب'
-            },
-            'quotation': {
-                'ar': 'عرض الأسعار'
-            },
-            'bulk tanker': {
-                'ar': 'ناقل البضائع السائبة'
-            },
-            'ex factory': {
-                'ar': 'التسليم من المصنع'
-            },
+            'sample': 'العينة',
+            'order': 'الطلب',
+            'quotation': 'عرض الأسعار',
+            'bulk tanker': 'ناقل البضائع السائبة',
+            'ex factory': 'التسليم من المصنع',
             # ADD CURRENCY TERMS TO PREVENT WRONG TRANSLATIONS
-            'bdt': {
-                'ar': 'تاكا بنغلاديشي'
-            },
-            'bangladeshi taka': {
-                'ar': 'تاكا بنغلاديشي'
-            },
-            'taka': {
-                'ar': 'تاكا'
-            },
-            'bdt (bangladeshi taka)': {
-                'ar': 'تاكا بنغلاديشي'
-            },
+            'bdt': 'تاكا بنغلاديشي',
+            'bangladeshi taka': 'تاكا بنغلاديشي',
+            'taka': 'تاكا',
+            'bdt (bangladeshi taka)': 'تاكا بنغلاديشي',
             
             # Add more currency protection
-            'price in bdt': {
-                'ar': 'السعر بالتاكا البنغلاديشي'
-            },
-            'bangladeshi taka (bdt)': {
-                'ar': 'تاكا بنغلاديشي'
-            },
+            'price in bdt': 'السعر بالتاكا البنغلاديشي',
+            'bangladeshi taka (bdt)': 'تاكا بنغلاديشي',
         }
     
-    def _normalize_term(self, term: str) -> str:
+    def _compile_translation_memory(self):
         """
-        Normalize terms for matching (case-insensitive, handle variations)
+        Precompile the Arabic memory into one alternation regex per direction so translations
+        never re-parse regexes. Rebuilt whenever the memory changes.
         """
-        # Convert to lowercase and strip whitespace
-        normalized = term.lower().strip()
-        
-        # Handle common variations
-        variations = {
-            'ex factory': 'ex factory',
-            'ex-factory': 'ex factory', 
-            'ex works': 'ex factory',
-            'ex-works' : 'ex factory',
-            'bulk tanker': 'bulk tanker',
-            'bulk-tanker': 'bulk tanker',
-            'bulk carrier': 'bulk tanker',
-            'bulk-carrier': 'bulk tanker',
-            'tt': 'tt',
-            't.t': 'tt',
-            'telegraphic transfer': 'tt',
-            'lc': 'lc',
-            'letter of credit': 'lc',
-            'full lc': 'full letter of credit'
+        # Single-pass alternations (longest term first so "bdt (bangladeshi taka)" beats "bdt")
+        self._ar_lookup = {
+            english_term.lower(): arabic_term
+            for english_term, arabic_term in self._translation_memory.items()
         }
-        
-        return variations.get(normalized, normalized)
+        self._ar_alt_re = re.compile(
+            r'\b(?:' + '|'.join(map(re.escape, sorted(self._ar_lookup, key=len, reverse=True))) + r')\b',
+            re.IGNORECASE
+        )
+        # Reverse lookup: Arabic -> first English term with that translation
+        self._ar_reverse_lookup = {}
+        for english_term, arabic_term in self._translation_memory.items():
+            self._ar_reverse_lookup.setdefault(arabic_term, english_term)
+        self._ar_reverse_re = re.compile(
+            '|'.join(map(re.escape, sorted(self._ar_reverse_lookup, key=len, reverse=True)))
+        )
     
     def _find_terms_in_text(self, text: str, language: str) -> Dict[str, str]:
         """
@@ -235,19 +367,11 @@ class TranslationManager:
         if language != 'ar':
             return {}
             
-        found_terms = {}
-        
-        # Check each term in translation memory
-        for english_term, translations in self._translation_memory.items():
-            # Create pattern to match the term (case-insensitive, word boundaries)
-            pattern = r'\b' + re.escape(english_term) + r'\b'
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            
-            for match in matches:
-                if 'ar' in translations:
-                    found_terms[match.group()] = translations['ar']
-        
-        return found_terms
+        # Same single pass (case-insensitive, word boundaries) the memory is applied with
+        return {
+            match.group(): self._ar_lookup[match.group().lower()]
+            for match in self._ar_alt_re.finditer(text)
+        }
     
     def _apply_translation_memory_after_translation(self, translated_text: str, target_lang: str) -> Tuple[str, Dict[str, str]]:
         """
@@ -257,20 +381,15 @@ class TranslationManager:
         if target_lang != 'ar':
             return translated_text, {}
         
-        # Find and replace known terms in the already-translated text
-        term_translations = self._find_terms_in_text(translated_text, target_lang)
-        processed_text = translated_text
+        # Find and replace known terms in the already-translated text in one pass
         applied_translations = {}
         
-        for original_term, correct_translation in term_translations.items():
-            # Replace the term while preserving context
-            pattern = re.compile(re.escape(original_term), re.IGNORECASE)
-            
-            def replace_preserve_case(match):
-                return correct_translation
-            
-            processed_text = pattern.sub(replace_preserve_case, processed_text)
-            applied_translations[original_term] = correct_translation
+        def replace_and_record(match):
+            correct_translation = self._ar_lookup[match.group().lower()]
+            applied_translations[match.group()] = correct_translation
+            return correct_translation
+        
+        processed_text = self._ar_alt_re.sub(replace_and_record, translated_text)
         
         return processed_text, applied_translations
     
@@ -282,120 +401,148 @@ class TranslationManager:
         if source_lang != 'ar':
             return text, {}
         
-        processed_text = text
         applied_translations = {}
         
-        # Check each term in translation memory for reverse lookup
-        for english_term, translations in self._translation_memory.items():
-            if 'ar' in translations:
-                translated_term = translations['ar']
-                
-                # Look for the translated term in the text
-                if translated_term in text:
-                    processed_text = processed_text.replace(translated_term, english_term)
-                    applied_translations[translated_term] = english_term
+        # Replace every known Arabic term with its English term in one pass
+        def replace_and_record(match):
+            english_term = self._ar_reverse_lookup[match.group()]
+            applied_translations[match.group()] = english_term
+            return english_term
+        
+        processed_text = self._ar_reverse_re.sub(replace_and_record, text)
         
         return processed_text, applied_translations
     
+    def _get_cached_translation(self, cache_key: Tuple[str, str, str], session_id: str) -> Optional[str]:
+        cached = self._translation_cache.get(cache_key)
+        if cached is not None:
+            self._translation_cache.move_to_end(cache_key)
+            logger.info("%s⚡ Translation cache hit [%s → %s] | Session: %s", Fore.CYAN, cache_key[0].upper(), cache_key[1].upper(), session_id)
+        return cached
+    
+    def _cache_translation(self, cache_key: Tuple[str, str, str], translated: str):
+        self._translation_cache[cache_key] = translated
+        if len(self._translation_cache) > TRANSLATION_CACHE_SIZE:
+            self._translation_cache.popitem(last=False)
+    
+    async def _share_inflight(self, cache_key: Tuple[str, str, str], translate) -> str:
+        """Run translate() once per key at a time; concurrent callers await the same task"""
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(translate())
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        # Shielded so one caller going away doesn't cancel the translation for the others
+        return await asyncio.shield(task)
+    
     def _get_language_display(self, lang_code: str) -> str:
         """Get colored language display"""
-        lang_info = self.supported_languages.get(lang_code, {'name': lang_code, 'color': Fore.WHITE})
-        return f"{lang_info['color']}{lang_code.upper()}{Style.RESET_ALL}"
+        lang_display = self._language_displays.get(lang_code)
+        if lang_display is None:
+            lang_display = f"{Fore.WHITE}{lang_code.upper()}{Style.RESET_ALL}"
+        return lang_display
     
     def _extract_and_preserve_language_fields(self, text: str, target_lang: str) -> tuple[str, Dict[str, str]]:
         """
         Extract language-specific fields from text and preserve them
         Returns: (cleaned_text, preserved_fields)
         """
-        # Pattern to match fields like name_bn, description_bn, specification_bn, etc.
-        field_patterns = {
-            'name': r'name_(en|ar|bn)\s*:\s*"([^"]*)"',
-            'description': r'description_(en|ar|bn)\s*:\s*"([^"]*)"', 
-            'specification': r'specification_(en|ar|bn)\s*:\s*"([^"]*)"',
-            'brand': r'brand_(en|ar|bn)\s*:\s*"([^"]*)"'
-        }
+        # Only "<field>_<target_lang>" fields are preserved, so a reply without that suffix
+        # (the usual case - most replies carry no product fields at all) needs no regex work
+        if f"_{target_lang}" not in text:
+            return text, {}
         
         preserved_fields = {}
-        cleaned_text = text
         
-        for field_type, pattern in field_patterns.items():
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for lang_suffix, field_value in matches:
-                field_key = f"{field_type}_{lang_suffix}"
-                # Only preserve fields that match our target language
-                if lang_suffix == target_lang:
-                    preserved_fields[field_key] = field_value
-                    # Remove the preserved field from text to avoid translation
-                    cleaned_text = re.sub(f'{field_key}\\s*:\\s*"[^"]*"', f'{field_key}: "[PRESERVED]"', cleaned_text)
+        def preserve(match):
+            field_type, lang_suffix, field_value = match.groups()
+            # Only preserve fields that match our target language
+            if lang_suffix != target_lang:
+                return match.group()
+            field_key = f"{field_type.lower()}_{lang_suffix}"
+            preserved_fields[field_key] = field_value
+            # Remove the preserved field from text to avoid translation
+            return f'{field_key}: "[PRESERVED]"'
+        
+        # One pass over the text for all field types
+        cleaned_text = _LANGUAGE_FIELD_RE.sub(preserve, text)
         
         return cleaned_text, preserved_fields
     
     def _restore_preserved_fields(self, translated_text: str, preserved_fields: Dict[str, str]) -> str:
         """Restore preserved language-specific fields back into translated text"""
-        result_text = translated_text
+        if not preserved_fields:
+            return translated_text
         
-        for field_key, field_value in preserved_fields.items():
+        restored = set()
+        
+        def restore(match):
+            field_key = match.group(1)
+            restored.add(field_key)
             # Replace the placeholder with the actual preserved value
-            placeholder = f'{field_key}: "[PRESERVED]"'
-            if placeholder in result_text:
-                result_text = result_text.replace(placeholder, f'{field_key}: "{field_value}"')
-            else:
+            return f'{field_key}: "{preserved_fields[field_key]}"'
+        
+        # One pass over the text for all placeholders (re caches the compiled pattern per key set)
+        placeholder_re = re.compile(
+            '(' + '|'.join(map(re.escape, preserved_fields)) + '): "\\[PRESERVED\\]"'
+        )
+        result_text = placeholder_re.sub(restore, translated_text)
+        
+        for field_key, field_value in preserved_fields.items():
+            if field_key not in restored:
                 # If placeholder not found, try to insert it at the end or appropriate location
                 result_text += f'\n{field_key}: "{field_value}"'
         
         return result_text
     
-    def _log_translation_flow(self, original: str, translated: str, direction: str, session_id: str = "", memory_applied: Dict[str, str] = None):
+    def _log_translation_flow(self, original: str, translated: str, source_lang: str, target_lang: str, session_id: str = "", memory_applied: Dict[str, str] = None):
         """Enhanced logging for translation flow"""
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        formats = _TO_ENGLISH_FLOW_FORMATS if target_lang == 'en' else _FROM_ENGLISH_FLOW_FORMATS
         
-        if direction == "to_english":
-            source_lang = self._current_source_lang if self._current_source_lang else 'unknown'
-            target_lang = 'en'
-            arrow = "🔄"
-            color = Fore.BLUE
-        else:
-            source_lang = 'en'
-            target_lang = self._current_target_lang if self._current_target_lang else 'unknown'
-            arrow = "🔄"
-            color = Fore.MAGENTA
-        
-        session_info = f" | Session: {session_id}" if session_id else ""
-        
-        logger.info(f"{color}{arrow} TRANSLATION FLOW [{source_lang.upper()} → {target_lang.upper()}]{session_info}")
-        
-        # Log memory applications if any
-        if memory_applied:
-            logger.info(f"{color}   🧠 TRANSLATION MEMORY APPLIED: {memory_applied}")
-        
-        logger.info(f"{color}   Original ({source_lang.upper()}): {Fore.WHITE}\"{original}\"")
-        logger.info(f"{color}   Translated ({target_lang.upper()}): {Fore.WHITE}\"{translated}\"")
-        logger.info(f"{color}{'-' * 60}")
-        
-        # Reset the current languages after logging
-        self._current_source_lang = None
-        self._current_target_lang = None
+        # Multi-line block - skip building any of it when INFO is filtered out
+        if logger.isEnabledFor(logging.INFO):
+            header_fmt, memory_fmt, original_fmt, translated_fmt, footer = formats
+            session_info = f" | Session: {session_id}" if session_id else ""
+            
+            logger.info(header_fmt, source_lang.upper(), target_lang.upper(), session_info)
+            
+            # Log memory applications if any
+            if memory_applied:
+                logger.info(memory_fmt, memory_applied)
+            
+            logger.info(original_fmt, source_lang.upper(), original)
+            logger.info(translated_fmt, target_lang.upper(), translated)
+            logger.info(footer)
     
     async def translate_to_english(self, text: str, source_lang: str, session_id: str = "") -> str:
         """
         Translate any text to English with enhanced logging and translation memory
         Uses queuing system to prevent parallel requests and rate limiting
         """
-        if source_lang == 'en':
+        # Arabic and Bengali script is never ASCII - empty, numeric or English input has nothing to translate
+        if source_lang == 'en' or text.isascii():
             return text
-            
+        
+        cache_key = (source_lang, 'en', text.strip())
+        cached = self._get_cached_translation(cache_key, session_id)
+        if cached is not None:
+            return cached
+        
+        return await self._share_inflight(
+            cache_key, lambda: self._translate_to_english(text, source_lang, session_id, cache_key)
+        )
+    
+    async def _translate_to_english(self, text: str, source_lang: str, session_id: str, cache_key: Tuple[str, str, str]) -> str:
+        """Uncached body of translate_to_english"""
         try:
             lang_display = self._get_language_display(source_lang)
-            logger.info(f"{Fore.CYAN}🎯 RECEIVED INPUT [{lang_display}]: {Fore.WHITE}\"{text}\"")
-            
-            # Set current source language for proper logging
-            self._current_source_lang = source_lang
+            logger.info("%s🎯 RECEIVED INPUT [%s]: %s\"%s\"", Fore.CYAN, lang_display, Fore.WHITE, text)
             
             # Apply reverse translation memory first (Arabic only)
             processed_text, memory_applied = self._reverse_translation_lookup(text, source_lang)
             
             if memory_applied:
-                logger.info(f"{Fore.YELLOW}🔄 REVERSE TRANSLATION MEMORY: {memory_applied}")
+                logger.info("%s🔄 REVERSE TRANSLATION MEMORY: %s", Fore.YELLOW, memory_applied)
             
             # Use queuing system for translation
             translated = await self.translation_queue.add_translation_request(
@@ -406,13 +553,14 @@ class TranslationManager:
             )
             
             # Log the translation flow with memory info
-            self._log_translation_flow(text, translated, "to_english", session_id, memory_applied)
+            self._log_translation_flow(text, translated, source_lang, 'en', session_id, memory_applied)
             
+            self._cache_translation(cache_key, translated)
             return translated
             
         except Exception as e:
-            logger.error(f"{Fore.RED}❌ TRANSLATION TO ENGLISH FAILED: {e}")
-            logger.info(f"{Fore.YELLOW}⚠️  Using original text as fallback")
+            logger.error("%s❌ TRANSLATION TO ENGLISH FAILED: %s", Fore.RED, e)
+            logger.info("%s⚠️  Using original text as fallback", Fore.YELLOW)
             return text
     
     async def translate_from_english(self, english_text: str, target_lang: str, session_id: str = "") -> str:
@@ -421,18 +569,27 @@ class TranslationManager:
         PRESERVES language-specific fields and applies translation memory AFTER translation (Arabic only)
         Uses queuing system to prevent parallel requests and rate limiting
         """
-        if target_lang == 'en':
+        # Empty or letter-free text (quantities, prices, dates) would come back unchanged
+        if target_lang == 'en' or not any(ch.isalpha() for ch in english_text):
             return english_text
-            
+        
+        cache_key = ('en', target_lang, english_text.strip())
+        cached = self._get_cached_translation(cache_key, session_id)
+        if cached is not None:
+            return cached
+        
+        return await self._share_inflight(
+            cache_key, lambda: self._translate_from_english(english_text, target_lang, session_id, cache_key)
+        )
+    
+    async def _translate_from_english(self, english_text: str, target_lang: str, session_id: str, cache_key: Tuple[str, str, str]) -> str:
+        """Uncached body of translate_from_english"""
         try:
-            # Set current target language for proper logging
-            self._current_target_lang = target_lang
-            
             # Step 1: Extract and preserve language-specific fields
             cleaned_text, preserved_fields = self._extract_and_preserve_language_fields(english_text, target_lang)
             
             if preserved_fields:
-                logger.info(f"{Fore.MAGENTA}🛡️  PRESERVING {len(preserved_fields)} {target_lang.upper()} FIELDS: {list(preserved_fields.keys())}")
+                logger.info("%s🛡️  PRESERVING %d %s FIELDS: %s", Fore.MAGENTA, len(preserved_fields), target_lang.upper(), list(preserved_fields))
             
             # Step 2: Use queuing system for translation
             translated_cleaned = await self.translation_queue.add_translation_request(
@@ -446,39 +603,41 @@ class TranslationManager:
             memory_corrected_text, memory_applied = self._apply_translation_memory_after_translation(translated_cleaned, target_lang)
             
             if memory_applied:
-                logger.info(f"{Fore.GREEN}🧠 TRANSLATION MEMORY CORRECTIONS: {memory_applied}")
+                logger.info("%s🧠 TRANSLATION MEMORY CORRECTIONS: %s", Fore.GREEN, memory_applied)
             
             # Step 4: Restore preserved language fields
             final_translated = self._restore_preserved_fields(memory_corrected_text, preserved_fields)
             
             # Log the translation flow with memory info
-            self._log_translation_flow(english_text, final_translated, "from_english", session_id, memory_applied)
+            self._log_translation_flow(english_text, final_translated, 'en', target_lang, session_id, memory_applied)
             
             lang_display = self._get_language_display(target_lang)
-            logger.info(f"{Fore.GREEN}📤 FINAL OUTPUT [{lang_display}]: {Fore.WHITE}\"{final_translated}\"")
+            logger.info("%s📤 FINAL OUTPUT [%s]: %s\"%s\"", Fore.GREEN, lang_display, Fore.WHITE, final_translated)
             
+            self._cache_translation(cache_key, final_translated)
             return final_translated
             
         except Exception as e:
-            logger.error(f"{Fore.RED}❌ TRANSLATION FROM ENGLISH FAILED: {e}")
-            logger.info(f"{Fore.YELLOW}⚠️  Using English text as fallback")
+            logger.error("%s❌ TRANSLATION FROM ENGLISH FAILED: %s", Fore.RED, e)
+            logger.info("%s⚠️  Using English text as fallback", Fore.YELLOW)
             return english_text
     
     def add_translation_memory_entry(self, english_term: str, arabic_translation: str = None):
         """
         Add new terms to translation memory - Arabic only
         """
-        self._translation_memory[english_term.lower()] = {
-            'ar': arabic_translation or english_term
-        }
-        logger.info(f"{Fore.GREEN}✅ Added to Arabic translation memory: '{english_term}' -> '{arabic_translation}'")
+        self._translation_memory[english_term.lower()] = arabic_translation or english_term
+        self._compile_translation_memory()
+        # Cached Arabic outputs may predate the new term
+        self._translation_cache.clear()
+        logger.info("%s✅ Added to Arabic translation memory: '%s' -> '%s'", Fore.GREEN, english_term, arabic_translation)
     
     def get_translation_memory_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the translation memory
         """
         total_terms = len(self._translation_memory)
-        arabic_terms = sum(1 for term in self._translation_memory.values() if term.get('ar'))
+        arabic_terms = sum(1 for arabic_term in self._translation_memory.values() if arabic_term)
         
         return {
             'total_terms': total_terms,
@@ -488,7 +647,9 @@ class TranslationManager:
     
     def get_queue_stats(self) -> Dict[str, Any]:
         """Get translation queue statistics"""
-        return self.translation_queue.get_queue_stats()
+        stats = self.translation_queue.get_queue_stats()
+        stats['cached_translations'] = len(self._translation_cache)
+        return stats
     
     def validate_language(self, language: str) -> bool:
         """
@@ -502,10 +663,14 @@ translator = TranslationManager()
 # Convenience functions for direct use
 async def translate_to_english(text: str, source_lang: str, session_id: str = "") -> str:
     """Convenience function to translate any text to English"""
+    if source_lang == 'en':
+        return text
     return await translator.translate_to_english(text, source_lang, session_id)
 
 async def translate_from_english(text: str, target_lang: str, session_id: str = "") -> str:
     """Convenience function to translate English text to target language"""
+    if target_lang == 'en':
+        return text
     return await translator.translate_from_english(text, target_lang, session_id)
 
 def is_supported_language(language: str) -> bool:
@@ -526,15 +691,19 @@ def get_translation_queue_stats() -> Dict[str, Any]:
 
 def log_chat_session_start(session_id: str, language: str, user_message: str):
     """Log the start of a chat session"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
     lang_display = translator._get_language_display(language)
-    logger.info(f"{Fore.BLUE}🚀 {'=' * 70}")
-    logger.info(f"{Fore.BLUE}🚀 CHAT SESSION STARTED [{lang_display}] | Session: {session_id}")
-    logger.info(f"{Fore.BLUE}🚀 {'=' * 70}")
-    logger.info(f"{Fore.CYAN}📥 USER INPUT [{lang_display}]: {Fore.WHITE}\"{user_message}\"")
+    logger.info("%s🚀 %s", Fore.BLUE, _RULE)
+    logger.info("%s🚀 CHAT SESSION STARTED [%s] | Session: %s", Fore.BLUE, lang_display, session_id)
+    logger.info("%s🚀 %s", Fore.BLUE, _RULE)
+    logger.info("%s📥 USER INPUT [%s]: %s\"%s\"", Fore.CYAN, lang_display, Fore.WHITE, user_message)
 
 def log_chat_session_end(session_id: str, language: str, ai_response: str):
     """Log the end of a chat session"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
     lang_display = translator._get_language_display(language)
-    logger.info(f"{Fore.GREEN}✅ CHAT SESSION COMPLETED [{lang_display}] | Session: {session_id}")
-    logger.info(f"{Fore.GREEN}📤 AI RESPONSE [{lang_display}]: {Fore.WHITE}\"{ai_response}\"")
-    logger.info(f"{Fore.GREEN}✅ {'=' * 70}")
\ No newline at end of file
+    logger.info("%s✅ CHAT SESSION COMPLETED [%s] | Session: %s", Fore.GREEN, lang_display, session_id)
+    logger.info("%s📤 AI RESPONSE [%s]: %s\"%s\"", Fore.GREEN, lang_display, Fore.WHITE, ai_response)
+    logger.info("%s✅ %s", Fore.GREEN, _RULE)
\ No newline at end of file
@@ -1,6 +1,10 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from routes import agent_test, chat
 from fastapi.middleware.cors import CORSMiddleware
+from core.db import ensure_indexes
+from services.order_placement import close_http_session
+from services.agent_manager import drain_pending_saves
 
 # Update origins to include your PERMANENT ngrok domain
 origins = [
@@ -14,7 +18,17 @@ origins = [
     "http://107.20.145.214:6001",
 ]
 
-app = FastAPI(title="Falcon Chatbot API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # TTL index that expires old agent sessions
+    await ensure_indexes()
+    yield
+    # Replies go out before their session is saved - let those saves land first
+    await drain_pending_saves()
+    # Pooled connections to the order API
+    await close_http_session()
+
+app = FastAPI(title="Falcon Chatbot API", lifespan=lifespan)
 
 # Add CORS middleware FIRST
 # Add authentication, Security, Logging and data compression as needed
@@ -37,4 +51,5 @@ async def root():
 # agar run button ya python command se chalna hua to for testing purposes
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127..0.0.1", port=8080)
\ No newline at end of file
+    # uvicorn[standard] ships uvloop + httptools; "auto" picks them up (and falls back on Windows)
+    uvicorn.run(app, host="127.0.0.1", port=8080, loop="auto", http="auto")
\ No newline at end of file
@@ -12,6 +12,37 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Frontend language names -> backend language codes
+LANGUAGE_MAP = {
+    "arabic": "ar",
+    "bangla": "bn", 
+    "bengali": "bn",  # alias for bangla
+    "english": "en",
+    "en": "en",  # In case frontend is modified to send ar, bn, en
+    "ar": "ar",  # 
+    "bn": "bn"   # 
+}
+# Exact spellings the frontend sends, so the common case needs no string work
+_LANGUAGE_MAP_EXACT = {
+    **LANGUAGE_MAP,
+    "Arabic": "ar",
+    "Bangla": "bn",
+    "Bengali": "bn",
+    "English": "en"
+}
+
+# Replies that skip the agents (and translation), by language code
+UNAUTHENTICATED_MESSAGES = {
+    "ar": "يرجى تسجيل الدخول أو الاشتراك لتفعيل الدردشة.",
+    "bn": "চ্যাটবট সক্রিয় করতে সাইন ইন বা সাইন আপ করুন।",
+    "en": "Please sign in or sign up to activate the chatbot."
+}
+ERROR_MESSAGES = {
+    "ar": "عذرًا، حدث خطأ. يرجى المحاولة مرة أخرى.",
+    "bn": "দুঃখিত, একটি ত্রুটি ঘটেছে। অনুগ্রহ করে আবার চেষ্টা করুন।",
+    "en": "Sorry, something went wrong. Please try again."
+}
+
 # Language mapping function
 def normalize_language(language_input: str) -> str:
     """
@@ -19,21 +50,14 @@ def normalize_language(language_input: str) -> str:
     Frontend sends: "Arabic", "Bangla", "English" 
     Backend expects: "ar", "bn", "en"
     """
-    language_map = {
-        "arabic": "ar",
-        "bangla": "bn", 
-        "bengali": "bn",  # alias for bangla
-        "english": "en",
-        "en": "en",  # In case frontend is modified to send ar, bn, en
-        "ar": "ar",  # 
-        "bn": "bn"   # 
-    }
-    
     if not language_input:
         return "en"
     
-    normalized_input = language_input.strip().lower()
-    return language_map.get(normalized_input, "en").lower()
+    language_code = _LANGUAGE_MAP_EXACT.get(language_input)
+    if language_code is not None:
+        return language_code
+    
+    return LANGUAGE_MAP.get(language_input.strip().lower(), "en")
 
 class ChatMessage(BaseModel):
     sessionId: str # sessionID is mandatory for it to work
@@ -56,12 +80,7 @@ async def chat_endpoint(chat: ChatMessage):
         language_code = normalize_language(language_input)
         
         # Return appropriate error message based on language
-        if language_code == "ar":
-            error_message = "يرجى تسجيل الدخول أو الاشتراك لتفعيل الدردشة."
-        elif language_code == "bn":
-            error_message = "চ্যাটবট সক্রিয় করতে সাইন ইন বা সাইন আপ করুন।"
-        else:
-            error_message = "Please sign in or sign up to activate the chatbot."
+        error_message = UNAUTHENTICATED_MESSAGES.get(language_code, UNAUTHENTICATED_MESSAGES["en"])
         
         return {"reply": error_message, "sessionId": session_id}
         
@@ -76,14 +95,8 @@ async def chat_endpoint(chat: ChatMessage):
     # Log both original and normalized language (FIXED: removed .upper())
     logger.info(f"🌐 CHAT REQUEST - Language: {language_input} -> {language_code}, Session: {session_id}")
     
-    # Save incoming message to Mongo (with normalized language code)
-    await db.chat_sessions.update_one(
-        {"_id": session_id},
-        {"$push": {"messages": {"role": "user", "message": user_message, "time": datetime.datetime.utcnow()}},
-         "$set": {"language": language_code}  # Store normalized code
-        },
-        upsert=True
-    )
+    # Incoming message is saved together with the reply below (one Mongo round trip per turn)
+    user_message_time = datetime.datetime.utcnow()
 
     # Run agent manager pipeline WITH LANGUAGE SUPPORT
     try:
@@ -101,17 +114,17 @@ async def chat_endpoint(chat: ChatMessage):
         logger.error(f"❌ Error in route_message: {e}")
         
         # Language-specific error messages using normalized code
-        if language_code == "ar":
-            ai_reply = "عذرًا، حدث خطأ. يرجى المحاولة مرة أخرى."
-        elif language_code == "bn":
-            ai_reply = "দুঃখিত, একটি ত্রুটি ঘটেছে। অনুগ্রহ করে আবার চেষ্টা করুন।"
-        else:
-            ai_reply = "Sorry, something went wrong. Please try again."
+        ai_reply = ERROR_MESSAGES.get(language_code, ERROR_MESSAGES["en"])
 
-    # Save AI reply to Mongo
+    # Save incoming message and AI reply to Mongo (with normalized language code)
     await db.chat_sessions.update_one(
         {"_id": session_id},
-        {"$push": {"messages": {"role": "ai", "message": ai_reply, "time": datetime.datetime.utcnow()}}},
+        {"$push": {"messages": {"$each": [
+            {"role": "user", "message": user_message, "time": user_message_time},
+            {"role": "ai", "message": ai_reply, "time": datetime.datetime.utcnow()}
+         ]}},
+         "$set": {"language": language_code}  # Store normalized code
+        },
         upsert=True
     )
 
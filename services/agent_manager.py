@@ -1,12 +1,14 @@
 from typing import Dict, Any
+import asyncio
 import datetime
 import logging
-from colorama import Fore, Style  # NEW: Import colorama for colored logging
+import os
+import weakref
 from core.db import db  # your MongoDB client
 from agents.product_request import handle_product_request
-from agents.request_details import handle_request_details
 from agents.address_purpose import handle_address_purpose
-from core.utils import translator, is_supported_language  # Import translation utilities
+from agents.fields import REQUIRED_FIELDS, DEFAULT_REQUIRED_FIELDS  # same requirements as the second agent
+from core.utils import Fore, Style, translator, is_supported_language  # Import translation utilities (+ tty-aware colours)
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -118,7 +120,7 @@ async def create_new_session(session_id: str, user_auth: str) -> Dict[str, Any]:
         "session_id": session_id,
         "userAuth": user_auth,
         "history": [],
-        "field_metadata": FIELD_METADATA,  # Store field definitions
+        # Field definitions stay in FIELD_METADATA (module constant) - not copied into every document
         "last_updated": datetime.datetime.utcnow()
     }
     await db.agent_sessions.update_one(
@@ -128,31 +130,110 @@ async def create_new_session(session_id: str, user_auth: str) -> Dict[str, Any]:
     )
     return data
 
+# Agents replay at most the last 18 exchanges (product_request), so older history is never loaded
+# (and, since the session is saved back whole, the stored history is capped at this length too)
+SESSION_HISTORY_LIMIT = 20
+# Skip what no agent reads: legacy schema copies (see create_new_session) and old history
+SESSION_PROJECTION = {
+    "field_metadata": 0,
+    "product_details.validation_info": 0,
+    "history": {"$slice": -SESSION_HISTORY_LIMIT}
+}
+
 async def load_session(session_id: str) -> Dict[str, Any]:
     """
     Load session document from MongoDB.
     """
-    # Clean old sessions (>1 day)
-    cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=1)
-    await db.agent_sessions.delete_many({"last_updated": {"$lt": cutoff}})
-
-    session = await db.agent_sessions.find_one({"_id": session_id})
+    # Old sessions (>1 day) are removed by the TTL index on last_updated (core.db.ensure_indexes)
+    session = await db.agent_sessions.find_one({"_id": session_id}, SESSION_PROJECTION)
     return session
 
+# Set by create_new_session and never changed afterwards - only written if the document is new
+SESSION_WRITE_ONCE_FIELDS = ("session_id", "userAuth")
+# Not re-sent on every save: _id is the filter, last_updated is stamped by the server
+_SESSION_UNSENT_FIELDS = frozenset(("_id", "last_updated") + SESSION_WRITE_ONCE_FIELDS)
+
 async def save_session(session_id: str, data: Dict[str, Any]):
     """
     Save session document to MongoDB.
     """
-    data["last_updated"] = datetime.datetime.utcnow()
+    update = {
+        "$set": {key: value for key, value in data.items() if key not in _SESSION_UNSENT_FIELDS},
+        # Server-side timestamp (also what the TTL index expires on)
+        "$currentDate": {"last_updated": True}
+    }
+    write_once = {key: data[key] for key in SESSION_WRITE_ONCE_FIELDS if key in data}
+    if write_once:
+        update["$setOnInsert"] = write_once
     await db.agent_sessions.update_one(
         {"_id": session_id},
-        {"$set": data},
+        update,
         upsert=True
     )
 
-# ---------- Dynamic Field Management ---------- #
+# In-flight background session writes, one per session_id (also keeps a strong ref to each task).
+# Read-your-writes only holds inside this process: with several uvicorn workers the next turn
+# can land on a worker that doesn't know about the pending save and load a stale session.
+# So saves only run in the background for a single worker (WEB_CONCURRENCY, uvicorn's
+# --workers default); with more, the turn awaits its save before replying.
+_pending_saves: Dict[str, asyncio.Task] = {}
+SESSION_SAVE_IN_BACKGROUND = int(os.getenv("WEB_CONCURRENCY", "1")) <= 1
 
-# In agent_manager.py - replace the expand_session_for_request function
+async def persist_session(session_id: str, data: Dict[str, Any], retries: int = 3):
+    """
+    Save session with a bounded retry. Runs as a background task so Mongo latency
+    is not part of the user-visible response time.
+    """
+    for attempt in range(1, retries + 1):
+        try:
+            await save_session(session_id, data)
+            return
+        except Exception as e:
+            logger.warning("⚠️ Session save failed (attempt %d/%d) | Session: %s: %s", attempt, retries, session_id, e)
+            if attempt < retries:
+                await asyncio.sleep(0.5 * attempt)
+    logger.error("❌ Giving up saving session %s after %d attempts", session_id, retries)
+
+def schedule_session_save(session_id: str, data: Dict[str, Any]):
+    """Fire-and-forget persist_session; the in-memory session_data is already up to date."""
+    task = asyncio.create_task(persist_session(session_id, data))
+    _pending_saves[session_id] = task
+
+    def _cleanup(done_task: asyncio.Task):
+        if _pending_saves.get(session_id) is done_task:
+            del _pending_saves[session_id]
+
+    task.add_done_callback(_cleanup)
+
+async def drain_pending_saves():
+    """Wait for every in-flight background save - called on shutdown so the last turns aren't lost"""
+    if _pending_saves:
+        logger.info("💾 Waiting for %d pending session save(s) before shutdown", len(_pending_saves))
+        await asyncio.gather(*list(_pending_saves.values()), return_exceptions=True)
+
+async def wait_for_pending_save(session_id: str):
+    """Make sure the previous turn's background save has landed before reading the session."""
+    task = _pending_saves.get(session_id)
+    if task is not None:
+        await asyncio.shield(task)
+
+async def load_session_after_pending_save(session_id: str) -> Dict[str, Any]:
+    """Load session data after any background save from the previous turn has finished."""
+    await wait_for_pending_save(session_id)
+    return await load_session(session_id)
+
+# One lock per session_id so two rapid messages from the same user can't interleave
+# load -> agent -> save on the same session document. Weak values: a lock is dropped as soon
+# as no turn holds or waits on it, so this doesn't grow with every session ever seen.
+_session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def get_session_lock(session_id: str) -> asyncio.Lock:
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = _session_locks[session_id] = asyncio.Lock()
+    return lock
+
+# ---------- Dynamic Field Management ---------- #
 
 def expand_session_for_request(data: Dict[str, Any]):
     """
@@ -161,36 +242,13 @@ def expand_session_for_request(data: Dict[str, Any]):
     """
     request_type = data.get("request", "").lower()
     
-    # Use the same field requirements as the second agent
-    field_requirements = {
-        "order":  ["unit", "quantity", "price_per_unit", "expected_price", "phone", "incoterm", "mode_of_payment", "packaging_pref", "delivery_date"],
-        "sample": ["unit", "quantity", "price_per_unit", "expected_price", "phone", "incoterm", "mode_of_payment", "packaging_pref", "delivery_date"],
-        "quote":  ["unit", "quantity", "price_per_unit", "expected_price", "phone", "incoterm", "mode_of_payment", "packaging_pref", "delivery_date"],  
-        "ppr":    ["unit", "quantity", "price_per_unit", "expected_price", "delivery_date"]  # PPR has different requirements
-    }
-    
     # Get the required fields for this request type
-    required_fields = field_requirements.get(request_type, ["unit", "quantity", "price_per_unit", "expected_price"])
+    required_fields = REQUIRED_FIELDS.get(request_type, DEFAULT_REQUIRED_FIELDS)
     
-    # Initialize only the required fields
+    # Initialize only the required fields (validation rules are read from FIELD_METADATA, not stored per session)
     for field_name in required_fields:
         if field_name not in data["product_details"]:
             data["product_details"][field_name] = ""
-        
-        # Store validation info with the field
-        if "validation_info" not in data["product_details"]:
-            data["product_details"]["validation_info"] = {}
-        
-        # Get field metadata
-        field_meta = FIELD_METADATA.get(field_name, {})
-        data["product_details"]["validation_info"][field_name] = {
-            "type": field_meta.get("type", "text"),
-            "options": field_meta.get("options", []),
-            "validation": field_meta.get("validation", ""),
-            "description": field_meta.get("description", field_name),
-            "required": True
-        }
-    
 
     return data
 
@@ -223,7 +281,12 @@ async def route_message(user_input: str, session_id: str, user_auth: str, langua
     """
     MAIN FUNCTION - UPDATED WITH ENHANCED TRANSLATION LOGGING
     Routes user input to the correct agent with translation support.
+    Turns of the same session run one at a time; different sessions still run concurrently.
     """
+    async with get_session_lock(session_id):
+        return await _route_message(user_input, session_id, user_auth, language)
+
+async def _route_message(user_input: str, session_id: str, user_auth: str, language: str) -> str:
     # Import enhanced logging functions
     from core.utils import log_chat_session_start, log_chat_session_end
     
@@ -235,15 +298,16 @@ async def route_message(user_input: str, session_id: str, user_auth: str, langua
     # Log session start
     log_chat_session_start(session_id, language, user_input)
     
-    # Step 1: Translate input to English if needed
+    # Step 1: Translate input to English if needed, while the session loads
     if language != "en":
-        english_input = await translator.translate_to_english(user_input, language, session_id)
+        english_input, session_data = await asyncio.gather(
+            translator.translate_to_english(user_input, language, session_id),
+            load_session_after_pending_save(session_id)
+        )
     else:
         english_input = user_input
         logger.info(f"{Fore.GREEN}🎯 PROCESSING ENGLISH INPUT: {Fore.WHITE}\"{english_input}\"")
-    
-    # Load session data
-    session_data = await load_session(session_id)
+        session_data = await load_session_after_pending_save(session_id)
 
     # If session doesn't exist, start a new one
     if not session_data:
@@ -267,6 +331,8 @@ async def route_message(user_input: str, session_id: str, user_auth: str, langua
                 logger.info(f"{Fore.CYAN}🔄 AGENT TRANSITION: product_request → request_details")
 
         elif current_agent == "request_details":
+            # Imported lazily so workers that never reach agent 2 skip its openai/phonenumbers setup
+            from agents.request_details import handle_request_details
             english_response, session_data = await handle_request_details(english_input, session_data)
             if session_data.get("agent") == "address_purpose":
                 session_data = expand_session_for_address_purpose(session_data)
@@ -292,8 +358,12 @@ async def route_message(user_input: str, session_id: str, user_auth: str, langua
         final_response = english_response
         logger.info(f"{Fore.GREEN}📤 FINAL ENGLISH RESPONSE: {Fore.WHITE}\"{final_response}\"")
 
-    # Save session to MongoDB
-    await save_session(session_id, session_data)
+    # Save session to MongoDB in the background - don't block the reply on the write
+    # (unless other workers may serve this session's next turn, see _pending_saves)
+    if SESSION_SAVE_IN_BACKGROUND:
+        schedule_session_save(session_id, session_data)
+    else:
+        await persist_session(session_id, session_data)
     await save_to_mongo_stub(session_id, user_input, final_response)
 
     # Log session completion
@@ -1,9 +1,70 @@
 # services/order_placement.py
 import asyncio
-import json
+import logging
 import aiohttp
+import orjson
 import ssl
 import certifi
+from urllib.parse import urlencode
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared by every order request: the backend's certificate is not verified (same as before),
+# and one pooled session keeps TCP+TLS connections alive between orders
+_SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where())
+_SSL_CONTEXT.check_hostname = False
+_SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+
+# A slow backend fails the order instead of holding the task and a pool slot indefinitely
+_ORDER_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=5, sock_connect=5, sock_read=20)
+
+_http_session: aiohttp.ClientSession = None
+
+# Fixed error responses; handlers return a copy so callers can't mutate the shared dicts
+ERROR_RESPONSES = {
+    "no_auth": {"status": "error", "error_type": "AUTH_ERROR", "message": "No authentication token provided"},
+    "address_corrupted": {"status": "error", "error_type": "ADDRESS_ERROR", "message": "Address data is corrupted. Please restart the order process."},
+    "address_missing": {"status": "error", "error_type": "ADDRESS_ERROR", "message": "Valid address ID not found. Please select a valid address."},
+    "product_missing": {"status": "error", "error_type": "DATA_ERROR", "message": "Product information missing. Please restart the order process."},
+    "ppr_parsing": {"status": "error", "error_type": "PARSING_ERROR", "message": "Invalid JSON returned from PPR API"},
+    "order_parsing": {"status": "error", "error_type": "PARSING_ERROR", "message": "Invalid JSON from server"},
+    # The backend may still have created the order/requirement after we gave up - don't invite a blind retry
+    "timeout": {"status": "error", "error_type": "TIMEOUT_ERROR", "message": "The order service took too long to respond, so we couldn't confirm whether your request went through. Please check your orders before trying again."}
+}
+
+# placeOrder form field → product_details key, only sent when the user gave a value
+OPTIONAL_ORDER_FIELDS = (
+    ("incoterm", "incoterm"),
+    ("modeOfPayment", "mode_of_payment"),
+    ("packingType", "packaging_pref"),
+    ("expectedPurchaseDate", "delivery_date"),
+    ("shippingContactNumber", "phone"),
+)
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared order API session, creating it on first use (needs a running loop)"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(
+            ssl=_SSL_CONTEXT,
+            limit=settings.ORDER_HTTP_LIMIT,
+            limit_per_host=settings.ORDER_HTTP_LIMIT,
+            use_dns_cache=True,
+            ttl_dns_cache=300,  # chemfalcon.com is resolved at most every 5 minutes
+            keepalive_timeout=75  # idle gaps between user orders are usually longer than a minute
+        )
+        _http_session = aiohttp.ClientSession(connector=connector, timeout=_ORDER_TIMEOUT)
+    return _http_session
+
+
+async def close_http_session():
+    """Close the shared session - called on app shutdown"""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
 
 
 async def place_order_request(session_data: dict):
@@ -11,18 +72,14 @@ async def place_order_request(session_data: dict):
     Main backend function to place orders or PPR requests.
     Automatically detects when request == "ppr"
     """
-    print("🚀 Processing order request...")
+    logger.info("🚀 Processing order request...")
 
     # Extract auth token
     user_auth_token = session_data.get("userAuth")
     if not user_auth_token:
-        return {
-            "status": "error",
-            "error_type": "AUTH_ERROR",
-            "message": "No authentication token provided"
-        }
+        return dict(ERROR_RESPONSES["no_auth"])
 
-    print(f"🔑 Using userAuth token: {user_auth_token[:15]}...")
+    logger.debug("🔑 Using userAuth token: %s...", user_auth_token[:15])
 
     request_type = session_data.get("request", "").lower()
 
@@ -31,7 +88,7 @@ async def place_order_request(session_data: dict):
         return await _process_ppr(session_data, user_auth_token)
 
     # ✅ Otherwise → normal order
-    return await _process_normal_order(session_data, user_auth_token)
+    return await _process_normal_order(session_data, user_auth_token, request_type)
 
 
 
@@ -42,36 +99,24 @@ async def _process_ppr(session_data: dict, user_auth_token: str):
     """
     Handles PPR requests EXACTLY like the curl reference
     """
-    print("📌 Request type = PPR → Using createRequirement API")
+    logger.info("📌 Request type = PPR → Using createRequirement API")
 
     product_details = session_data.get("product_details", {})
     address_data = session_data.get("address", {})
 
     # ❌ NO PLACEHOLDER: Strict validation
     if not isinstance(address_data, dict):
-        return {
-            "status": "error",
-            "error_type": "ADDRESS_ERROR",
-            "message": "Address data is corrupted. Please restart the order process."
-        }
+        return dict(ERROR_RESPONSES["address_corrupted"])
 
     address_id = address_data.get("_id")
     if not address_id or address_id == "unknown":
-        return {
-            "status": "error", 
-            "error_type": "ADDRESS_ERROR",
-            "message": "Valid address ID not found. Please select a valid address."
-        }
+        return dict(ERROR_RESPONSES["address_missing"])
 
     # Validate required fields for PPR
     required_fields = ["product_id", "quantity", "unit", "delivery_date"]
     for field in required_fields:
         if field == "product_id" and not session_data.get("product_id"):
-            return {
-                "status": "error",
-                "error_type": "DATA_ERROR", 
-                "message": "Product information missing. Please restart the order process."
-            }
+            return dict(ERROR_RESPONSES["product_missing"])
         elif field in ["quantity", "unit", "delivery_date"] and not product_details.get(field):
             return {
                 "status": "error",
@@ -89,8 +134,8 @@ async def _process_ppr(session_data: dict, user_auth_token: str):
         "endDate": product_details.get("delivery_date")
     }
 
-    print("📦 PPR JSON Payload:")
-    print(json.dumps(payload, indent=2))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("📦 PPR JSON Payload:\n%s", orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode())
 
     url = "https://chemfalcon.com:2053/order/createRequirement"
     headers = {
@@ -101,46 +146,42 @@ async def _process_ppr(session_data: dict, user_auth_token: str):
 
     # ✅ Send JSON request
     try:
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-
-        async with aiohttp.ClientSession(connector=connector) as session:
-            print(f"🌐 Sending PPR request → {url}")
-            async with session.post(url, headers=headers, json=payload, ssl=False) as response:
-                response_text = await response.text()
-
-                print(f"🔍 PPR Response Status: {response.status}")
-                print(f"🔍 PPR Response Body: {response_text}")
-
-                try:
-                    result = json.loads(response_text)
-                except:
-                    return {
-                        "status": "error",
-                        "error_type": "PARSING_ERROR",
-                        "message": "Invalid JSON returned from PPR API"
-                    }
-
-                if response.status in (200, 201) and result.get("error") == False:
-                    return {
-                        "status": "success",
-                        "message": result.get("message", "Requirement created successfully"),
-                        "data": result.get("results", {}).get("requirement"),
-                        "requirement_id": result.get("results", {}).get("requirement", {}).get("_id")
-                    }
-
+        session = get_http_session()
+        logger.debug("🌐 Sending PPR request → %s", url)
+        async with session.post(url, headers=headers, json=payload) as response:
+            try:
+                # Parsed straight from the body bytes (no str decode), whatever the Content-Type header says
+                result = orjson.loads(await response.read())
+            except orjson.JSONDecodeError:
+                result = None
+
+            logger.info("🔍 PPR Response Status: %s", response.status)
+            logger.debug("🔍 PPR Response Body: %s", result)
+
+            if not isinstance(result, dict):
+                return dict(ERROR_RESPONSES["ppr_parsing"])
+
+            if response.status in (200, 201) and result.get("error") == False:
                 return {
-                    "status": "error",
-                    "error_type": "API_ERROR",
-                    "message": result.get("message", "Unknown error"),
-                    "status_code": response.status
+                    "status": "success",
+                    "message": result.get("message", "Requirement created successfully"),
+                    "data": result.get("results", {}).get("requirement"),
+                    "requirement_id": result.get("results", {}).get("requirement", {}).get("_id")
                 }
 
+            return {
+                "status": "error",
+                "error_type": "API_ERROR",
+                "message": result.get("message", "Unknown error"),
+                "status_code": response.status
+            }
+
+    except asyncio.TimeoutError:
+        logger.error("⏰ PPR request timed out")
+        return dict(ERROR_RESPONSES["timeout"])
+
     except Exception as e:
-        print(f"❌ Unexpected PPR error: {e}")
+        logger.error("❌ Unexpected PPR error: %s", e)
         return {
             "status": "error",
             "error_type": "UNKNOWN_ERROR",
@@ -152,105 +193,97 @@ async def _process_ppr(session_data: dict, user_auth_token: str):
 # ----------------------------------------------------------------------
 # ✅ NORMAL ORDER HANDLER (placeOrder)
 # ----------------------------------------------------------------------
-async def _process_normal_order(session_data: dict, user_auth_token: str):
+async def _process_normal_order(session_data: dict, user_auth_token: str, request_type: str):
     """
-    Processes normal order placement using multipart/form-data
+    Processes normal order placement using an application/x-www-form-urlencoded body
     EXACTLY matching backend expectations.
     """
-    print("📌 Request type = Normal Order → Using placeOrder API")
+    logger.info("📌 Request type = Normal Order → Using placeOrder API")
 
     product_details = session_data.get("product_details", {})
     address_data = session_data.get("address", {})
 
-    # ✅ Build FormData
-    form_data = aiohttp.FormData()
+    # ✅ Build form fields as (name, value) pairs, then encode the body in one go
 
     # ✅ Add address without stringifying
-    for key, value in address_data.items():
-        if key == "_id":
-            continue
-        if value not in (None, "", []):
-            form_data.add_field(f"address[{key}]", str(value))
+    fields = [
+        (f"address[{key}]", value if isinstance(value, str) else str(value))
+        for key, value in address_data.items()
+        if key != "_id" and value not in (None, "", [])
+    ]
 
     # ✅ Standard required fields
-    form_data.add_field("product", session_data.get("product_id", ""))
-    form_data.add_field("quantity", str(product_details.get("quantity", "")))
-    form_data.add_field("expectedAmount", str(product_details.get("expected_price", "")))
-    form_data.add_field("quantityType", product_details.get("unit", ""))
-    form_data.add_field("type", session_data.get("request", "").capitalize())
+    fields += [
+        ("product", session_data.get("product_id", "")),
+        ("quantity", str(product_details.get("quantity", ""))),
+        ("expectedAmount", str(product_details.get("expected_price", ""))),
+        ("quantityType", product_details.get("unit", "")),
+        ("type", request_type.capitalize())
+    ]
 
     # ✅ Sample order flag
-    if session_data.get("request", "").lower() == "sample":
-        form_data.add_field("isSampleOrder", "TRUE")
+    if request_type == "sample":
+        fields.append(("isSampleOrder", "TRUE"))
 
     # ✅ Optional fields
     if session_data.get("industry_id"):
-        form_data.add_field("industry", session_data["industry_id"])
-
-    if product_details.get("incoterm"):
-        form_data.add_field("incoterm", product_details["incoterm"])
+        fields.append(("industry", session_data["industry_id"]))
 
-    if product_details.get("mode_of_payment"):
-        form_data.add_field("modeOfPayment", product_details["mode_of_payment"])
+    for form_name, detail_key in OPTIONAL_ORDER_FIELDS:
+        value = product_details.get(detail_key)
+        if value:
+            fields.append((form_name, value))
 
-    if product_details.get("packaging_pref"):
-        form_data.add_field("packingType", product_details["packaging_pref"])
-
-    if product_details.get("delivery_date"):
-        form_data.add_field("expectedPurchaseDate", product_details["delivery_date"])
-
-    if product_details.get("phone"):
-        form_data.add_field("shippingContactNumber", product_details["phone"])
+    # All values are strings, so this is the same urlencoded body aiohttp.FormData would send,
+    # without its per-request writer/payload objects
+    form_body = urlencode(fields).encode()
 
     # ✅ API endpoint
     url = "https://chemfalcon.com:2053/order/placeOrder"
     headers = {
         "x-auth-token-user": user_auth_token,
-        "x-user-type": "Buyer"
+        "x-user-type": "Buyer",
+        "Content-Type": "application/x-www-form-urlencoded"
     }
 
     # ✅ Send POST request
     try:
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-
-        async with aiohttp.ClientSession(connector=connector) as session:
-            print(f"🌐 Sending normal order → {url}")
-            async with session.post(url, headers=headers, data=form_data, ssl=False) as response:
-                response_text = await response.text()
-
-                print(f"🔍 Order Response Status: {response.status}")
-                print(f"🔍 Order Response Body: {response_text}")
-
-                try:
-                    result = json.loads(response_text)
-                except:
-                    return {
-                        "status": "error",
-                        "error_type": "PARSING_ERROR",
-                        "message": "Invalid JSON from server"
-                    }
-
-                if response.status in (200, 201) and result.get("error") == False:
-                    return {
-                        "status": "success",
-                        "message": result.get("message", "Order placed successfully!"),
-                        "data": result.get("results", {}).get("order"),
-                        "order_id": result.get("results", {}).get("order", {}).get("_id")
-                    }
-
+        session = get_http_session()
+        logger.debug("🌐 Sending normal order → %s", url)
+        async with session.post(url, headers=headers, data=form_body) as response:
+            try:
+                # Parsed straight from the body bytes (no str decode), whatever the Content-Type header says
+                result = orjson.loads(await response.read())
+            except orjson.JSONDecodeError:
+                result = None
+
+            logger.info("🔍 Order Response Status: %s", response.status)
+            logger.debug("🔍 Order Response Body: %s", result)
+
+            if not isinstance(result, dict):
+                return dict(ERROR_RESPONSES["order_parsing"])
+
+            if response.status in (200, 201) and result.get("error") == False:
                 return {
-                    "status": "error",
-                    "error_type": "API_ERROR",
-                    "message": result.get("message", "Unknown error"),
-                    "status_code": response.status
+                    "status": "success",
+                    "message": result.get("message", "Order placed successfully!"),
+                    "data": result.get("results", {}).get("order"),
+                    "order_id": result.get("results", {}).get("order", {}).get("_id")
                 }
 
+            return {
+                "status": "error",
+                "error_type": "API_ERROR",
+                "message": result.get("message", "Unknown error"),
+                "status_code": response.status
+            }
+
+    except asyncio.TimeoutError:
+        logger.error("⏰ Normal order request timed out")
+        return dict(ERROR_RESPONSES["timeout"])
+
     except Exception as e:
-        print(f"❌ Unexpected normal order error: {e}")
+        logger.error("❌ Unexpected normal order error: %s", e)
         return {
             "status": "error",
             "error_type": "UNKNOWN_ERROR",